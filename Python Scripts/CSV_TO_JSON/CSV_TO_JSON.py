@@ -1,11 +1,26 @@
+import argparse
 import csv
+import glob
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def csv_to_json(csv_file, json_file):
-    # Read the CSV
+from binders import COLLECTIONS, build_binders, write_binders
+from csv_io import detect_delimiter
+from price_history import PriceHistory
+from search_index import build_index, write_index
+from shards import write_shards
+from sidecars import DIST, HASHED_RE, publish
+from summary import load_baseline, previous_snapshot, summarize, write_summary
+
+def csv_to_json(csv_file, json_file, verbose=True):
+    # Read the CSV (cards.csv uses ';', the per-set CSVs ',')
     with open(csv_file, mode="r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f, delimiter=";")
+        sample = f.read(4096)
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter=detect_delimiter(sample))
         rows = list(reader)
 
     # Convert numeric columns if possible
@@ -27,10 +42,109 @@ def csv_to_json(csv_file, json_file):
     with open(json_file, mode="w", encoding="utf-8") as f:
         json.dump(rows, f, indent=2, ensure_ascii=False)
 
-    print(f"Converted {csv_file} → {json_file} ({len(rows)} records)")
+    if verbose:
+        print(f"Converted {csv_file} → {json_file} ({len(rows)} records)")
+    return rows
+
+def _convert_job(job):
+    csv_file, json_file = job
+    started = time.perf_counter()
+    try:
+        rows = csv_to_json(csv_file, json_file, verbose=False)
+    except Exception as e:  # report it with its file; the rest of the batch carries on
+        return csv_file, json_file, None, f"{type(e).__name__}: {e}"
+    return csv_file, json_file, len(rows), time.perf_counter() - started
+
+def convert_batch(patterns, out_dir=None, jobs=None, force=False):
+    """Convert every CSV matching the glob patterns to JSON (same name, .json) in
+    worker processes. Outputs newer than their input are skipped unless force.
+    With out_dir, each output keeps its path relative to the inputs' common
+    folder, so same-named CSVs from different folders don't overwrite each
+    other. Returns the number of files that failed."""
+    todo, skipped = [], 0
+    # content-hashed copies (config.<hash>.csv) left by older builds are not inputs
+    inputs = sorted({Path(p) for pat in patterns for p in glob.glob(pat, recursive=True)
+                     if not HASHED_RE.search(Path(p).name)})
+    base = Path(os.path.commonpath([p.parent.resolve() for p in inputs])) if inputs else None
+    for csv_file in inputs:
+        if out_dir:
+            json_file = Path(out_dir) / csv_file.parent.resolve().relative_to(base) / (csv_file.stem + ".json")
+        else:
+            json_file = csv_file.with_suffix(".json")
+        if not force and json_file.exists() and json_file.stat().st_mtime >= csv_file.stat().st_mtime:
+            skipped += 1
+            continue
+        json_file.parent.mkdir(parents=True, exist_ok=True)
+        todo.append((csv_file, json_file))
+
+    started, failed = time.perf_counter(), []
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for csv_file, json_file, n, result in pool.map(_convert_job, todo):
+            if n is None:
+                failed.append((csv_file, result))
+                print(f"FAILED {csv_file}")
+            else:
+                print(f"Converted {csv_file} → {json_file} ({n} records, {result * 1000:.0f} ms)")
+    print(f"{len(todo) - len(failed)} converted, {len(failed)} failed, {skipped} up to date, "
+          f"{time.perf_counter() - started:.2f}s total")
+    for csv_file, err in failed:
+        print(f"  {csv_file}: {err}")
+    return len(failed)
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Convert cards.csv to cards.json, with price history and summary.json")
+    ap.add_argument("--baseline", default=None,
+                    help="cards.json snapshot or YYYY-MM-DD history date for the summary deltas "
+                         "(default: the previous history snapshot)")
+    ap.add_argument("--batch", nargs="+", metavar="GLOB",
+                    help="Only convert the CSVs matching these globs (e.g. '../../collections/*.csv') to JSON")
+    ap.add_argument("--out-dir", default=None, help="With --batch: write the JSON files here instead of next to each CSV")
+    ap.add_argument("--jobs", type=int, default=None, help="With --batch: worker processes (default: CPU count)")
+    ap.add_argument("--force", action="store_true", help="With --batch: convert even when the JSON is newer than the CSV")
+    args = ap.parse_args()
+
+    if args.batch:
+        raise SystemExit(1 if convert_batch(args.batch, args.out_dir, args.jobs, args.force) else 0)
+
     # Adjust these filenames as needed
     csv_path = Path("cards.csv")
     json_path = Path("cards.json")
-    csv_to_json(csv_path, json_path)
\ No newline at end of file
+    rows = csv_to_json(csv_path, json_path)
+
+    # Append today's prices to the history (replaces keeping old cards.json copies)
+    with PriceHistory(csv_path.with_name("price_history.sqlite")) as hist:
+        if not hist.dates():
+            print("Price history is new: commit price_history.sqlite with cards.csv, and seed older prices with "
+                  "'python price_history.py import <old cards.json> --date YYYY-MM-DD'")
+        baseline = args.baseline or previous_snapshot(hist)
+        changed = hist.append(rows)
+        base_rows, label = load_baseline(baseline, hist) if baseline else (None, None)
+    print(f"Price history: {changed} card(s) changed")
+
+    # Headline totals per language / set / type for the site's stat tiles
+    summary_path = json_path.with_name("summary.json")
+    write_summary(summarize(rows, base_rows, label), summary_path)
+    print(f"Wrote {summary_path}" + (f" (deltas vs {label})" if label else ""))
+
+    # One JSON shard per set + manifest, for loading only the sets on screen
+    shard_dir = json_path.with_name("cards")
+    manifest = write_shards(rows, shard_dir)
+    print(f"Wrote {len(manifest['sets'])} set shards to {shard_dir}/")
+
+    # Prebuilt search index for the collection filter
+    index_path = json_path.with_name("search_index.json")
+    write_index(build_index(rows), index_path)
+    print(f"Wrote {index_path}")
+
+    # Binder manifest: per-set CSVs joined with these quantities
+    outputs = [json_path, summary_path, index_path, *sorted(shard_dir.glob("*.json"))]
+    if (COLLECTIONS / "config.csv").exists():
+        binders_path = COLLECTIONS / "binders.json"
+        binders = build_binders(rows)
+        write_binders(binders, binders_path)
+        print(f"Wrote {binders_path}")
+        outputs += [binders_path, COLLECTIONS / "config.csv", *(COLLECTIONS / s["file"] for s in binders["sets"])]
+
+    # Copies + .gz/.zst sidecars + content-hashed names under dist/, rewritten only when content changed
+    written, unchanged = publish(outputs)
+    print(f"Published to {DIST}: {written} file(s) updated, {unchanged} unchanged")
\ No newline at end of file
@@ -0,0 +1,118 @@
+import argparse
+import csv
+import json
+from datetime import date as Date
+from pathlib import Path
+
+from csv_io import detect_delimiter, read_rows
+from summary import language
+
+# Binder manifest: every set from collections/config.csv with its cards
+# (from the per-set CSVs) already joined to the quantities in cards.csv, plus
+# completion stats, so the binder view needs one request and no client-side
+# join. The per-set CSVs get their Availability column filled with the owned
+# quantity on the way.
+
+COLLECTIONS = Path(__file__).resolve().parents[2] / "collections"
+
+
+def canonical_lookup(v):
+    """Same as canonicalLookup() in script.js."""
+    return str(v or "").strip().lower()
+
+
+def owned_quantities(cards):
+    owned = {}
+    for row in cards:
+        lk = canonical_lookup(row.get("lookupID"))
+        if not lk:
+            continue
+        try:
+            owned[lk] = int(float(row.get("Quantity") or 0))
+        except (TypeError, ValueError):
+            owned[lk] = 0
+    return owned
+
+
+def fill_availability(path, rows, owned):
+    """Write owned quantities into the set CSV's Availability column; only rewrites when something changed."""
+    changed = False
+    for r in rows:
+        qty = str(owned.get(canonical_lookup(r.get("lookupid")), 0))
+        if (r.get("Availability") or "") != qty:
+            r["Availability"] = qty
+            changed = True
+    if changed:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            delim = detect_delimiter(f.read(4096))
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f, delimiter=delim, lineterminator="\n")  # keep the file's LF endings
+            w.writerow(["id", "lookupid", "set number", "Availability"])
+            for r in rows:
+                w.writerow([r.get("id", ""), r.get("lookupid", ""), r.get("set number", ""), r["Availability"]])
+    return changed
+
+
+def set_language(cfg):
+    """From the Name's "[Japanese] ..." prefix, as languageFromCard() in script.js reads
+    it; config rows without a prefix fall back to the link, like detectSetLanguage()."""
+    lang = language({"Set": cfg.get("Name")})
+    if lang == "unknown":
+        lang = "japanese" if "japanese" in (cfg.get("link") or cfg.get("fileName") or "").lower() else "english"
+    return lang
+
+
+def build_binders(cards, collections=COLLECTIONS, write_csv=True):
+    owned = owned_quantities(cards)
+    manifest = {"generated": Date.today().isoformat(), "sets": []}
+    for cfg in read_rows(Path(collections) / "config.csv"):
+        name, file_name = cfg.get("Name") or "", cfg.get("fileName") or ""
+        path = Path(collections) / file_name
+        if not (name and file_name and path.exists()):
+            continue
+        rows = [r for r in read_rows(path) if (r.get("lookupid") or "").strip()]
+        if write_csv and fill_availability(path, rows, owned):
+            print(f"Filled Availability in {path}")
+        set_cards = []
+        for r in rows:
+            set_cards.append({"lookup": r["lookupid"].strip(), "num": (r.get("set number") or "").strip(),
+                              "qty": owned.get(canonical_lookup(r["lookupid"]), 0)})
+        have = sum(1 for c in set_cards if c["qty"] > 0)
+        manifest["sets"].append({
+            "id": cfg.get("id") or "",
+            "name": name,
+            "link": cfg.get("link") or "",
+            "file": file_name,
+            "language": set_language(cfg),
+            "total": len(set_cards),
+            "owned": have,
+            "pct": round(have / len(set_cards) * 100) if set_cards else 0,
+            "copies": sum(c["qty"] for c in set_cards),
+            "cards": set_cards,
+        })
+    return manifest
+
+
+def write_binders(manifest, path):
+    with open(path, mode="w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Join the per-set binder CSVs with cards.csv quantities.")
+    ap.add_argument("--cards", default="cards.csv")
+    ap.add_argument("--collections", default=str(COLLECTIONS), help="Folder with config.csv and the per-set CSVs")
+    ap.add_argument("--out", default=None, help="Manifest path (default: <collections>/binders.json)")
+    ap.add_argument("--no-write-csv", action="store_true", help="Don't fill Availability in the per-set CSVs")
+    args = ap.parse_args()
+
+    manifest = build_binders(read_rows(args.cards), args.collections, write_csv=not args.no_write_csv)
+    out = Path(args.out or Path(args.collections) / "binders.json")
+    write_binders(manifest, out)
+    for s in manifest["sets"]:
+        print(f"{s['name']}: {s['owned']}/{s['total']} ({s['pct']}%)")
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import csv
+
+# CSV reading shared by the converter and the binder join: cards.csv uses ';',
+# the per-set CSVs and config.csv use ',' or ';' depending on who saved them.
+
+
+def detect_delimiter(sample):
+    """Most frequent of ; , tab | in the sample (',' when none occurs)."""
+    cands = [";", ",", "\t", "|"]
+    counts = {c: sample.count(c) for c in cands}
+    return max(counts, key=counts.get) if any(counts.values()) else ","
+
+
+def read_rows(path):
+    """All rows of a CSV as dicts, delimiter sniffed from the first 4 KB."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        return list(csv.DictReader(f, delimiter=detect_delimiter(sample)))
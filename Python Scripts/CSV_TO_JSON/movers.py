@@ -0,0 +1,104 @@
+import argparse
+import csv
+import heapq
+import json
+from pathlib import Path
+
+from csv_io import read_rows
+from price_history import PriceHistory
+from summary import load_baseline, previous_snapshot
+
+# Top movers: cards.csv joined against a baseline by lookupID (one dict build
+# over the baseline, one pass over the current rows), ranked per set by
+# absolute and percentage change in Raw / PSA 10 price.
+
+CSV_FIELDS = ["Set", "rank_by", "direction", "lookupID", "Name", "Type", "Quantity",
+              "Raw Price old", "Raw Price", "Raw change", "Raw change %",
+              "PSA 10 Price old", "PSA 10 Price", "PSA 10 change", "PSA 10 change %", "Value change"]
+
+
+def _n(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def join_changes(rows, baseline_rows):
+    """One row per card present in both, with old/new prices and their changes."""
+    base = {str(b.get("lookupID") or "").strip(): b for b in baseline_rows}
+    out = []
+    for c in rows:
+        b = base.get(str(c.get("lookupID") or "").strip())
+        if b is None:
+            continue
+        row = {"Set": c.get("Set") or "", "lookupID": c.get("lookupID"), "Name": c.get("Name"),
+               "Type": c.get("Type"), "Quantity": int(_n(c.get("Quantity")) or 0)}
+        for col, short in (("Raw Price", "Raw"), ("PSA 10 Price", "PSA 10")):
+            new, old = _n(c.get(col)), _n(b.get(col))
+            row[col + " old"], row[col] = old, new
+            if new is None or old is None:
+                row[short + " change"] = row[short + " change %"] = None
+                continue
+            row[short + " change"] = round(new - old, 2)
+            row[short + " change %"] = round((new - old) / old * 100, 1) if old else None
+        row["Value change"] = round((row["Raw change"] or 0) * row["Quantity"], 2)
+        out.append(row)
+    return out
+
+
+def rank(changes, top=10):
+    """{set: {"Raw change": {"up": [...], "down": [...]}, "Raw change %": ..., ...}} plus an "ALL" entry."""
+    by_set = {"ALL": changes}
+    for r in changes:
+        by_set.setdefault(r["Set"], []).append(r)
+    report = {}
+    for set_name, rows in sorted(by_set.items()):
+        report[set_name] = {}
+        for key in ("Raw change", "Raw change %", "PSA 10 change", "PSA 10 change %"):
+            up = [r for r in rows if (r[key] or 0) > 0]
+            down = [r for r in rows if (r[key] or 0) < 0]
+            report[set_name][key] = {"up": heapq.nlargest(top, up, key=lambda r: r[key]),
+                                     "down": heapq.nsmallest(top, down, key=lambda r: r[key])}
+    return report
+
+
+def write_report(report, json_path, csv_path):
+    with open(json_path, mode="w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    with open(csv_path, mode="w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_FIELDS, delimiter=";", extrasaction="ignore")
+        w.writeheader()
+        for set_name, keys in report.items():
+            for key, sides in keys.items():
+                for direction, rows in sides.items():
+                    for r in rows:
+                        w.writerow({**r, "Set": set_name, "rank_by": key, "direction": direction})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Top movers in cards.csv against a baseline snapshot.")
+    ap.add_argument("--csv", default="cards.csv")
+    ap.add_argument("--baseline", default=None,
+                    help="cards.json snapshot or YYYY-MM-DD history date (default: the previous history snapshot)")
+    ap.add_argument("--top", type=int, default=10, help="Cards per set and direction (default 10)")
+    ap.add_argument("--out", default="movers", help="Output name without extension (writes .json and .csv)")
+    args = ap.parse_args()
+
+    csv_path = Path(args.csv)
+    with PriceHistory(csv_path.with_name("price_history.sqlite")) as hist:
+        baseline = args.baseline or previous_snapshot(hist)
+        if not baseline:
+            raise SystemExit("No baseline: pass --baseline or convert on an earlier day first")
+        base_rows, label = load_baseline(baseline, hist)
+
+    changes = join_changes(read_rows(csv_path), base_rows)
+    report = rank(changes, args.top)
+    write_report(report, Path(args.out + ".json"), Path(args.out + ".csv"))
+    print(f"{len(changes)} cards matched against {label}; wrote {args.out}.json and {args.out}.csv")
+    for r in report.get("ALL", {}).get("Raw change", {}).get("up", [])[:5]:
+        print(f"  {r['Raw change']:+8.2f}  {r['Name']} ({r['Set']})")
+
+
+if __name__ == "__main__":
+    main()
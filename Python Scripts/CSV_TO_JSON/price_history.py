@@ -0,0 +1,180 @@
+import argparse
+import json
+import sqlite3
+from datetime import date as Date
+from pathlib import Path
+
+# Append-only price history for cards.csv, one SQLite file instead of whole
+# cards.json copies per snapshot. A card gets a new row only on a date where
+# its quantity or prices changed; a card that disappears gets a qty 0 row.
+# "Value at X" is each card's latest row on or before X.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    lookupID TEXT NOT NULL,
+    date     TEXT NOT NULL,          -- YYYY-MM-DD
+    qty      INTEGER NOT NULL,
+    raw      REAL,
+    psa10    REAL,
+    PRIMARY KEY (lookupID, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cards (
+    lookupID TEXT PRIMARY KEY,
+    Name TEXT, "Set" TEXT, Type TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (date TEXT PRIMARY KEY, cards INTEGER) WITHOUT ROWID;
+"""
+
+LATEST_AT = """
+SELECT p.lookupID, p.qty, p.raw, p.psa10, c.Name, c."Set", c.Type
+FROM prices p
+JOIN (SELECT lookupID, MAX(date) AS d FROM prices WHERE date <= ? GROUP BY lookupID) last
+  ON p.lookupID = last.lookupID AND p.date = last.d
+LEFT JOIN cards c ON c.lookupID = p.lookupID
+"""
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _qty(v):
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return 0
+
+
+class PriceHistory:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def dates(self):
+        return [d for (d,) in self.db.execute("SELECT date FROM snapshots ORDER BY date")]
+
+    def append(self, rows, date=None):
+        """Record cards.csv/cards.json rows as of `date` (default today).
+        Returns how many cards changed since their previous row.
+
+        A date older than recorded snapshots (importing an old cards.json) is
+        slotted in: every card it changes gets a row at the next snapshot
+        restoring what that snapshot recorded, so later values stay as they
+        were, and card names/sets are only filled in where still unknown."""
+        date = str(date or Date.today())
+        later = [d for d in self.dates() if d > date]
+        before = {r["lookupID"]: r for r in self.value_at(date, include_removed=True)}
+        after = {r["lookupID"]: r for r in self.value_at(later[0], include_removed=True)} if later else None
+        seen, changed, meta = set(), [], []
+        for row in rows:
+            lid = str(row.get("lookupID") or "").strip()
+            if not lid:
+                continue
+            seen.add(lid)
+            new = (_qty(row.get("Quantity")), _num(row.get("Raw Price")), _num(row.get("PSA 10 Price")))
+            old = before.get(lid)
+            if old is None or (old["qty"], old["raw"], old["psa10"]) != new:
+                changed.append((lid, date) + new)
+            meta.append((lid, row.get("Name"), row.get("Set"), row.get("Type")))
+        for lid, old in before.items():
+            if lid not in seen and old["qty"]:
+                changed.append((lid, date, 0, old["raw"], old["psa10"]))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?)", changed)
+            self.db.executemany(f'INSERT OR {"IGNORE" if later else "REPLACE"} INTO cards VALUES (?, ?, ?, ?)', meta)
+            if later:
+                restore = []
+                for r in self.value_at(later[0], include_removed=True):
+                    was = after.get(r["lookupID"])
+                    if was is None:  # not in the later snapshot at all
+                        if r["qty"]:
+                            restore.append((r["lookupID"], later[0], 0, r["raw"], r["psa10"]))
+                    elif (was["qty"], was["raw"], was["psa10"]) != (r["qty"], r["raw"], r["psa10"]):
+                        restore.append((r["lookupID"], later[0], was["qty"], was["raw"], was["psa10"]))
+                self.db.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?)", restore)
+            self.db.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?)", (date, len(seen)))
+        return len(changed)
+
+    def value_at(self, date, include_removed=False):
+        """Every card as it stood on `date`: dicts with lookupID, qty, raw, psa10, Name, Set, Type."""
+        keys = ("lookupID", "qty", "raw", "psa10", "Name", "Set", "Type")
+        rows = (dict(zip(keys, r)) for r in self.db.execute(LATEST_AT, (str(date),)))
+        return [r for r in rows if include_removed or r["qty"]]
+
+    def change_since(self, since, until=None):
+        """Per-card changes between `since` and `until` (default today), biggest raw value change first."""
+        old = {r["lookupID"]: r for r in self.value_at(since)}
+        new = {r["lookupID"]: r for r in self.value_at(until or Date.today())}
+        out = []
+        for lid in old.keys() | new.keys():
+            a, b = old.get(lid), new.get(lid)
+            cur = b or a
+            row = {"lookupID": lid, "Name": cur["Name"], "Set": cur["Set"], "Type": cur["Type"],
+                   "qty_old": a["qty"] if a else 0, "qty_new": b["qty"] if b else 0,
+                   "raw_old": a["raw"] if a else None, "raw_new": b["raw"] if b else None,
+                   "psa10_old": a["psa10"] if a else None, "psa10_new": b["psa10"] if b else None}
+            if (row["qty_old"], row["raw_old"], row["psa10_old"]) == (row["qty_new"], row["raw_new"], row["psa10_new"]):
+                continue
+            row["value_old"] = round(row["qty_old"] * (row["raw_old"] or 0), 2)
+            row["value_new"] = round(row["qty_new"] * (row["raw_new"] or 0), 2)
+            row["value_change"] = round(row["value_new"] - row["value_old"], 2)
+            out.append(row)
+        out.sort(key=lambda r: -abs(r["value_change"]))
+        return out
+
+    def total_at(self, date):
+        rows = self.value_at(date)
+        return round(sum(r["qty"] * (r["raw"] or 0) for r in rows), 2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query or seed the cards.csv price history.")
+    ap.add_argument("--db", default="price_history.sqlite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("dates", help="List recorded snapshot dates")
+    p = sub.add_parser("at", help="Collection value on a date")
+    p.add_argument("date")
+    p = sub.add_parser("since", help="Cards whose value changed since a date")
+    p.add_argument("date")
+    p.add_argument("--until", default=None)
+    p.add_argument("--top", type=int, default=20)
+    p = sub.add_parser("import", help="Seed history from an old cards.json snapshot")
+    p.add_argument("json_file")
+    p.add_argument("--date", required=True, help="Date the snapshot was taken (YYYY-MM-DD)")
+    args = ap.parse_args()
+
+    with PriceHistory(args.db) as hist:
+        if args.cmd == "dates":
+            for d in hist.dates():
+                print(d)
+        elif args.cmd == "at":
+            rows = hist.value_at(args.date)
+            print(f"{args.date}: {len(rows)} cards, {sum(r['qty'] for r in rows)} copies, raw total {hist.total_at(args.date)}")
+        elif args.cmd == "since":
+            changes = hist.change_since(args.date, args.until)
+            total = round(sum(c["value_change"] for c in changes), 2)
+            print(f"{len(changes)} cards changed since {args.date}, raw total {total:+}")
+            for c in changes[:args.top]:
+                print(f"{c['value_change']:+9.2f}  {c['raw_old']} -> {c['raw_new']}  {c['Name']} ({c['Set']})")
+        elif args.cmd == "import":
+            with open(args.json_file, encoding="utf-8") as f:
+                rows = json.load(f)
+            n = hist.append(rows, args.date)
+            print(f"Imported {args.json_file} as {args.date} ({n} changed cards)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import json
+import re
+import time
+import unicodedata
+
+# Prebuilt search index over Name / Set / lookupID / ID (the fields the
+# collection filter in script.js searches), so a keystroke is a few list
+# lookups instead of rebuilding and lowercasing a haystack per card.
+#
+# search_index.json:
+#   tokens    sorted vocabulary of normalized words
+#   postings  per token, the cards (positions in cards.json) containing it,
+#             delta-encoded
+#   trigrams  trigram -> tokens containing it (delta-encoded token numbers),
+#             for matching inside words
+#
+# Results are exactly those of applyFilters() in script.js: the whole query,
+# trimmed and lowercased, as one substring of "Name Set lookupID ID". The
+# index only narrows the candidates: a query word matches every token that
+# contains it (found via trigrams, or by scanning the vocabulary for one- and
+# two-letter words), and only cards holding all the query's words get the
+# substring check. Tokens are accent-folded, so that prefilter never drops a
+# card the substring check would keep.
+
+FIELDS = ("Name", "Set", "lookupID", "ID")
+
+
+def normalize(text):
+    """Lowercase, strip accents (Pokémon -> pokemon) and split into words."""
+    text = unicodedata.normalize("NFKD", str(text or "").lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.findall(r"[a-z0-9]+", text)
+
+
+def _js_str(v):
+    """`${v || ''}` as script.js builds it: falsy values are empty, 3.0 prints as 3."""
+    if not v:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def haystack(card):
+    """The text applyFilters() in script.js searches for a card."""
+    return " ".join(_js_str(card.get(f)) for f in FIELDS).lower()
+
+
+def card_tokens(card):
+    words = set()
+    for field in FIELDS:
+        words.update(normalize(_js_str(card.get(field))))
+    return words
+
+
+def _delta(ids):
+    return [b - a for a, b in zip([0] + ids, ids)]
+
+
+def _undelta(deltas):
+    out, acc = [], 0
+    for d in deltas:
+        acc += d
+        out.append(acc)
+    return out
+
+
+def build_index(rows):
+    posting = {}
+    for i, card in enumerate(rows):
+        for w in card_tokens(card):
+            posting.setdefault(w, []).append(i)
+    tokens = sorted(posting)
+    trigrams = {}
+    for t, w in enumerate(tokens):
+        for g in {w[j:j + 3] for j in range(len(w) - 2)}:
+            trigrams.setdefault(g, []).append(t)
+    return {
+        "version": 1,
+        "cards": len(rows),
+        "tokens": tokens,
+        "postings": [_delta(posting[w]) for w in tokens],
+        "trigrams": {g: _delta(ts) for g, ts in sorted(trigrams.items())},
+    }
+
+
+def write_index(index, path):
+    with open(path, mode="w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+
+
+class Searcher:
+    """Reference implementation of the lookup the site would do with search_index.json
+    and the cards.json rows it was built from."""
+
+    def __init__(self, index, rows):
+        self.tokens = index["tokens"]
+        self.postings = [_undelta(p) for p in index["postings"]]
+        self.trigrams = {g: _undelta(ts) for g, ts in index["trigrams"].items()}
+        self.hay = [haystack(c) for c in rows]
+
+    def _tokens_containing(self, word):
+        if len(word) < 3:  # too short for trigrams: scan the vocabulary (a few thousand words, not cards)
+            return [t for t, w in enumerate(self.tokens) if word in w]
+        cands = None
+        for g in {word[j:j + 3] for j in range(len(word) - 2)}:
+            ts = set(self.trigrams.get(g, ()))
+            cands = ts if cands is None else cands & ts
+            if not cands:
+                return []
+        return [t for t in cands if word in self.tokens[t]]
+
+    def search(self, query):
+        """Positions in cards.json of the cards applyFilters() would keep for `query`."""
+        q = query.strip().lower()
+        if not q:
+            return list(range(len(self.hay)))
+        cands = None
+        for word in normalize(q):
+            docs = set()
+            for t in self._tokens_containing(word):
+                docs.update(self.postings[t])
+            cands = docs if cands is None else cands & docs
+            if not cands:
+                return []
+        # no words at all (e.g. "-"): nothing to narrow with, check every card
+        pool = range(len(self.hay)) if cands is None else sorted(cands)
+        return [i for i in pool if q in self.hay[i]]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build or query the collection search index.")
+    ap.add_argument("--cards", default="cards.json")
+    ap.add_argument("--index", default="search_index.json")
+    ap.add_argument("query", nargs="*", help="Query the index instead of building it")
+    args = ap.parse_args()
+
+    if not args.query:
+        with open(args.cards, encoding="utf-8") as f:
+            index = build_index(json.load(f))
+        write_index(index, args.index)
+        print(f"Wrote {args.index} ({len(index['tokens'])} tokens, {index['cards']} cards)")
+        return
+
+    with open(args.cards, encoding="utf-8") as f:
+        rows = json.load(f)
+    with open(args.index, encoding="utf-8") as f:
+        searcher = Searcher(json.load(f), rows)
+    started = time.perf_counter()
+    hits = searcher.search(" ".join(args.query))
+    took = (time.perf_counter() - started) * 1000
+    print(f"{len(hits)} match(es) in {took:.2f} ms")
+    for i in hits[:20]:
+        print(f"  {rows[i].get('Name')} ({rows[i].get('Set')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import hashlib
+import json
+import os
+import re
+from datetime import date as Date
+from pathlib import Path
+
+from summary import language, totals
+
+# One compact JSON file per Set plus a manifest, so the site can fetch only
+# the sets it shows. Shard names carry a content hash, so an unchanged set
+# keeps its URL and can be cached forever; a changed set gets a new name.
+
+
+def set_slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-") or "no-set"
+
+
+def _intact(path, digest):
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest() == digest
+    except OSError:
+        return False
+
+
+def write_shards(rows, out_dir):
+    """Write <out_dir>/<set-slug>.<hash>.json per Set and <out_dir>/manifest.json.
+    Returns the manifest. Shards from earlier runs that are no longer listed are removed."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    by_set = {}
+    for row in rows:
+        by_set.setdefault(row.get("Set") or "", []).append(row)
+
+    manifest = {"generated": Date.today().isoformat(), "sets": []}
+    keep = {"manifest.json"}
+    for name in sorted(by_set):
+        body = json.dumps(by_set[name], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        file_name = f"{set_slug(name)}.{digest[:12]}.json"
+        path = out_dir / file_name
+        if not _intact(path, digest):  # new, or truncated/corrupted by an earlier run
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+        keep.add(file_name)
+        manifest["sets"].append({"Set": name, "language": language({"Set": name}), "file": file_name,
+                                 "sha256": digest, "bytes": len(body), **totals(by_set[name])})
+
+    for old in out_dir.glob("*.*.json"):
+        stale_shard = re.search(r"\.[0-9a-f]{12}\.json$", old.name) and not old.name.startswith("manifest.")
+        if stale_shard and old.name not in keep:
+            old.unlink()
+    with open(out_dir / "manifest.json", mode="w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
@@ -0,0 +1,157 @@
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+# Precompressed copies of the generated data for static hosting, written to a
+# separate dist/ tree so nothing lands next to the sources. Each file goes to
+# the folder the site loads it from: its own folder relative to the repo root,
+# except the converter's outputs, which the site reads from cache/ (SITE_DIRS).
+# scripts/build.mjs adds the site itself around them.
+#   <file>                         plain copy
+#   <file>.gz / <file>.zst         served instead of <file> when the client accepts them
+#   <stem>.<hash><ext> (+ .gz/.zst) content-addressed copy that can be cached forever
+# Each dist folder gets an assets.json mapping file name -> source, sha256,
+# size, hashed name and compressed sizes. Nothing is rewritten unless the
+# content changed, so timestamps (and any CDN caches) stay put between
+# identical builds.
+
+ROOT = Path(__file__).resolve().parents[2]
+DIST = ROOT / "dist"
+MANIFEST = "assets.json"
+HASHED_RE = re.compile(r"\.[0-9a-f]{12}\.[a-z]+$")
+SIDECARS = (".gz", ".zst")
+SITE_DIRS = {"Python Scripts/CSV_TO_JSON": "cache"}  # source folder -> folder the site fetches from
+
+
+def _zstd():
+    """zstd compressor, or None when neither Python 3.14's compression.zstd nor zstandard is available."""
+    try:
+        from compression import zstd
+        return lambda data: zstd.compress(data, level=19)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard.ZstdCompressor(level=19).compress
+    except ImportError:
+        return None
+
+
+def _write(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _unlink_all(folder, name):
+    for ext in ("",) + SIDECARS:
+        (folder / (name + ext)).unlink(missing_ok=True)
+
+
+def hashed_name(path, digest):
+    """cards.json -> cards.<hash>.json; names that already carry a hash (set shards) stay as they are."""
+    if HASHED_RE.search(path.name):
+        return path.name
+    return f"{path.stem}.{digest[:12]}{path.suffix}"
+
+
+def source_key(path, root=ROOT):
+    """(dist subfolder, source path as recorded in assets.json) for a source file."""
+    path = path.resolve()
+    try:
+        rel = path.relative_to(root)
+    except ValueError:  # outside the repo: straight into dist/
+        return Path(), str(path)
+    parent = rel.parent.as_posix()
+    for src, site in SITE_DIRS.items():
+        if parent == src or parent.startswith(src + "/"):
+            return Path(site + parent[len(src):]), rel.as_posix()
+    return rel.parent, rel.as_posix()
+
+
+def publish(paths, dist=DIST, root=ROOT):
+    """Write plain copies, sidecars, hashed copies and per-folder assets.json for
+    `paths` under `dist`. Returns (files rewritten, files unchanged)."""
+    zstd = _zstd()
+    if zstd is None:
+        print("zstd not available (Python 3.14+ or `pip install zstandard`); writing .gz only")
+    outputs = {".gz": lambda b: gzip.compress(b, 9, mtime=0)}
+    if zstd:
+        outputs[".zst"] = zstd
+    dist, root = Path(dist).resolve(), Path(root).resolve()
+    by_dir = {}
+    for p in paths:
+        p = Path(p)
+        if not p.is_file() or p.name == MANIFEST or p.suffix in SIDECARS + (".tmp",):
+            continue
+        if dist in p.resolve().parents:  # never republish our own output
+            continue
+        sub, source = source_key(p, root)
+        by_dir.setdefault(dist / sub, []).append((p, source))
+
+    written = unchanged = 0
+    for folder, files in by_dir.items():
+        folder.mkdir(parents=True, exist_ok=True)
+        manifest_path = folder / MANIFEST
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = {}
+        before = json.dumps(manifest, sort_keys=True)
+
+        # sources that are gone (e.g. replaced set shards) take their published copies with them
+        for name in [n for n, e in manifest.items() if not (root / e.get("source", "")).is_file()]:
+            _unlink_all(folder, name)
+            if manifest[name].get("hashed"):
+                _unlink_all(folder, manifest[name]["hashed"])
+            del manifest[name]
+
+        for path, source in sorted(files):
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            prev = manifest.get(path.name, {})
+            plain, hashed = folder / path.name, folder / hashed_name(path, digest)
+            targets = {plain, hashed}
+            complete = all(Path(str(t) + ext).exists() for t in targets for ext in ("",) + tuple(outputs))
+            if prev.get("sha256") == digest and complete:
+                unchanged += 1
+                continue
+
+            entry = {"source": source, "sha256": digest, "bytes": len(data), "hashed": hashed.name}
+            for t in targets:
+                _write(t, data)
+            for ext, compress in outputs.items():
+                packed = compress(data)
+                for t in targets:
+                    _write(Path(str(t) + ext), packed)
+                entry[ext.lstrip(".")] = len(packed)
+            # drop the previous content-addressed copy of this file
+            old = prev.get("hashed")
+            if old and old not in (hashed.name, path.name):
+                _unlink_all(folder, old)
+            manifest[path.name] = entry
+            written += 1
+
+        if json.dumps(manifest, sort_keys=True) != before:
+            _write(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    return written, unchanged
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write .gz/.zst sidecars and content-hashed copies of data files.")
+    ap.add_argument("files", nargs="+", help="Files or globs, e.g. cards.json '../../collections/*.csv'")
+    ap.add_argument("--dist", default=str(DIST), help="Output tree (default: <repo>/dist)")
+    ap.add_argument("--root", default=str(ROOT), help="Folder the dist layout is relative to (default: the repo)")
+    args = ap.parse_args()
+    paths = [p for pat in args.files for p in (glob.glob(pat) or [pat])]
+    written, unchanged = publish(paths, args.dist, args.root)
+    print(f"{written} file(s) updated, {unchanged} unchanged in {args.dist}")
+
+
+if __name__ == "__main__":
+    main()
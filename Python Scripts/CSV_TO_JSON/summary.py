@@ -0,0 +1,101 @@
+import json
+import re
+from datetime import date as Date
+from pathlib import Path
+
+# Headline numbers for the collection page, precomputed so the site doesn't
+# have to reduce over cards.json (and the baseline) on every filter change.
+# Same definitions as updateStats() in script.js:
+#   totalCards  = sum of Quantity        uniqueCards = number of rows
+#   totalRaw    = Raw Total (or Raw Price x Quantity)
+#   totalPSA10  = PSA 10 Price x Quantity
+
+
+def _n(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def language(card):
+    """Same rule as languageFromCard() in script.js."""
+    s = str(card.get("Set") or "").lower()
+    if re.match(r"^\s*\[english\]", s):
+        return "english"
+    if re.match(r"^\s*\[(?:japanese|japansese)\]", s):
+        return "japanese"
+    return "unknown"
+
+
+def _totals(rows):
+    """{group: {key: [totalCards, uniqueCards, totalRaw, totalPSA10]}} in one pass over rows."""
+    out = {"all": {}, "language": {}, "set": {}, "type": {}}
+    for c in rows:
+        qty = _n(c.get("Quantity"))
+        vals = (qty, 1, _n(c.get("Raw Total")) or _n(c.get("Raw Price")) * qty, _n(c.get("PSA 10 Price")) * qty)
+        for group, key in (("all", "all"), ("language", language(c)),
+                           ("set", c.get("Set") or ""), ("type", c.get("Type") or "")):
+            acc = out[group].setdefault(key, [0.0, 0, 0.0, 0.0])
+            for i, v in enumerate(vals):
+                acc[i] += v
+    return out
+
+
+def _entry(vals):
+    return {"totalCards": int(vals[0]), "uniqueCards": int(vals[1]),
+            "totalRaw": round(vals[2], 2), "totalPSA10": round(vals[3], 2)}
+
+
+def totals(rows):
+    """totalCards / uniqueCards / totalRaw / totalPSA10 over all of `rows`."""
+    return _entry(_totals(rows)["all"].get("all", [0, 0, 0, 0]))
+
+
+def summarize(rows, baseline_rows=None, baseline_label=None):
+    """Totals overall and per language / Set / Type, each with a delta against
+    the baseline rows when given."""
+    cur = _totals(rows)
+    old = _totals(baseline_rows) if baseline_rows is not None else None
+    summary = {"generated": Date.today().isoformat(), "baseline": baseline_label}
+    for group, keys in cur.items():
+        summary[group] = {}
+        for key in sorted(keys.keys() | (old[group].keys() if old else set())):
+            a = keys.get(key, [0, 0, 0, 0])
+            entry = _entry(a)
+            if old is not None:
+                b = old[group].get(key, [0, 0, 0, 0])
+                entry["delta"] = _entry([x - y for x, y in zip(a, b)])
+            summary[group][key] = entry
+    summary["all"] = summary["all"].get("all", _entry([0, 0, 0, 0]))
+    return summary
+
+
+def load_baseline(spec, history=None):
+    """Baseline rows from a cards.json snapshot path, or from the price history
+    as of a YYYY-MM-DD date. Returns (rows, label)."""
+    path = Path(spec)
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("data") or data.get("cards") or list(data.values())
+        return data, str(spec)
+    if history is not None and re.fullmatch(r"\d{4}-\d{2}-\d{2}", spec):
+        rows = [{"lookupID": r["lookupID"], "Name": r["Name"], "Set": r["Set"], "Type": r["Type"],
+                 "Quantity": r["qty"], "Raw Price": r["raw"], "PSA 10 Price": r["psa10"]}
+                for r in history.value_at(spec)]
+        return rows, spec
+    raise SystemExit(f"Baseline {spec!r} is neither a cards.json file nor a YYYY-MM-DD date in the price history")
+
+
+def previous_snapshot(history, today=None):
+    """Latest history date before today (the site's 'vs previous snapshot')."""
+    today = str(today or Date.today())
+    earlier = [d for d in history.dates() if d < today]
+    return earlier[-1] if earlier else None
+
+
+def write_summary(summary, path):
+    with open(path, mode="w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Compare image download backends: the default requests.Session (HTTP/1.1) against
+--http2 (httpx, one multiplexed connection per host).
+
+Each backend pulls the same N images at concurrency C through the scraper's own
+fetch_to_part(), so timings include the sniffing/integrity path real runs use.
+
+By default it serves the images from a local fake CDN (synthetic JPEGs with
+a fixed per-request latency) over TLS with ALPN h2/http/1.1, using hypercorn
+and a throwaway self-signed certificate (needs `pip install hypercorn` and
+the openssl CLI). --cdn plain uses the stdlib HTTP/1.1 server instead; httpx
+can't do HTTP/2 without TLS, so that run only measures connection reuse and
+client overhead. Or point --urls at a real host (one URL per line, e.g. CDN
+image URLs taken from .scraper/failed.json).
+
+The HTTP version of every response is recorded and printed with the results;
+the run fails if the h2 backend never actually negotiated HTTP/2.
+
+  python bench_download_backends.py --count 200 --concurrency 8 --latency 0.05
+  python bench_download_backends.py --urls cdn_urls.txt --concurrency 8
+"""
+from __future__ import annotations
+import argparse, asyncio, socket, statistics, subprocess, tempfile, threading, time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Tuple
+
+import pricecharting_scraper_hires_v5_only_missing as scraper
+
+def fake_jpeg(size: int) -> bytes:
+    """SOI + padding + EOI: enough for sniff_image_ext() and image_looks_complete()."""
+    return b"\xff\xd8\xff\xe0" + b"\x00" * max(0, size - 6) + b"\xff\xd9"
+
+class FakeCDN:
+    """Local HTTP/1.1 image server on 127.0.0.1 with artificial per-request latency."""
+    def __init__(self, size: int, latency: float):
+        body = fake_jpeg(size)
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like a CDN
+            def do_GET(self):
+                time.sleep(latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *a):
+                pass
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def self_signed_cert(workdir: Path) -> Tuple[Path, Path]:
+    cert, key = workdir / "cdn.crt", workdir / "cdn.key"
+    try:
+        subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                        "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+                        "-keyout", str(key), "-out", str(cert)],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise SystemExit(f"Could not create a self-signed certificate with openssl ({e}); use --cdn plain")
+    return cert, key
+
+class FakeH2CDN:
+    """Local HTTPS image server (ALPN h2 + http/1.1) on 127.0.0.1, served by hypercorn."""
+    def __init__(self, size: int, latency: float, workdir: Path):
+        try:
+            from hypercorn.config import Config
+        except ImportError:
+            raise SystemExit("The HTTP/2 fake CDN needs hypercorn: pip install hypercorn (or use --cdn plain)")
+        body = fake_jpeg(size)
+        headers = [(b"content-type", b"image/jpeg"), (b"content-length", str(len(body)).encode())]
+
+        async def app(scope, receive, send):
+            if scope["type"] == "lifespan":
+                while True:
+                    msg = await receive()
+                    await send({"type": msg["type"] + ".complete"})
+                    if msg["type"] == "lifespan.shutdown":
+                        return
+            await asyncio.sleep(latency)
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        self.cert, key = self_signed_cert(workdir)
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(128)
+        self.config = Config()
+        self.config.bind = [f"fd://{self.sock.fileno()}"]
+        self.config.certfile, self.config.keyfile = str(self.cert), str(key)
+        self.config.alpn_protocols = ["h2", "http/1.1"]
+        self.config.accesslog = self.config.errorlog = None
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self.stop = None
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self):
+        from hypercorn.asyncio import serve
+        asyncio.set_event_loop(self.loop)
+        self.stop = asyncio.Event()
+        self.loop.run_until_complete(serve(self.app, self.config, shutdown_trigger=self.stop.wait))
+
+    def __enter__(self):
+        self.thread.start()
+        return f"https://127.0.0.1:{self.sock.getsockname()[1]}"
+
+    def __exit__(self, *exc):
+        if self.stop is not None:
+            self.loop.call_soon_threadsafe(self.stop.set)
+        self.thread.join(timeout=10)
+        try: self.sock.close()
+        except OSError: pass  # hypercorn already closed the fd
+
+def http_version(resp) -> str:
+    """Negotiated protocol of a response from either backend."""
+    if getattr(resp, "http_version", None):  # httpx
+        return resp.http_version
+    raw = getattr(getattr(resp, "raw", None), "version", None)  # requests/urllib3: 10 / 11
+    return {10: "HTTP/1.0", 11: "HTTP/1.1", 20: "HTTP/2"}.get(raw, "?")
+
+def run_backend(http2: bool, urls, concurrency: int, workdir: Path, verify=True) -> dict:
+    sess = scraper.new_download_session(http2, verify=verify)
+    if not http2 and verify is not True:
+        sess.trust_env = False  # REQUESTS_CA_BUNDLE would win over the session's own CA bundle
+    versions = Counter()
+    lock = threading.Lock()
+    get = sess.get
+    def recording_get(*a, **kw):
+        r = get(*a, **kw)
+        with lock: versions[http_version(r)] += 1
+        return r
+    sess.get = recording_get
+    # pacing is not what's being measured
+    scraper.RATE = scraper.RateController(rate=1e6, max_rate=1e6)
+    latencies, failures = [], 0
+    def one(i_u):
+        i, u = i_u
+        part = workdir / f"{'h2' if http2 else 'h1'}_{i}.part"
+        started = time.perf_counter()
+        ok = scraper.fetch_to_part(u, part, referer=u, session=sess)
+        took = time.perf_counter() - started
+        part.unlink(missing_ok=True)
+        return ok, took
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for ok, took in pool.map(one, enumerate(urls)):
+            latencies.append(took)
+            failures += not ok
+    wall = time.perf_counter() - started
+    if http2: sess.close()
+    latencies.sort()
+    return {
+        "wall": wall,
+        "per_sec": len(urls) / wall if wall else 0.0,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "failures": failures,
+        "versions": versions,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark requests (HTTP/1.1) vs httpx (HTTP/2) image downloads")
+    ap.add_argument("--urls", help="File with one image URL per line (default: local fake CDN)")
+    ap.add_argument("--count", type=int, default=200, help="Images to fetch from the fake CDN (default 200)")
+    ap.add_argument("--size", type=int, default=150_000, help="Fake image size in bytes (default 150000)")
+    ap.add_argument("--latency", type=float, default=0.05, help="Fake CDN per-request latency in seconds (default 0.05)")
+    ap.add_argument("--concurrency", type=int, default=8, help="Concurrent downloads (default 8)")
+    ap.add_argument("--backends", default="h1,h2", help="Comma list of h1,h2 (default both)")
+    ap.add_argument("--cdn", choices=("h2", "plain"), default="h2",
+                    help="Fake CDN: h2 = HTTPS with HTTP/2 via hypercorn (default), plain = stdlib HTTP/1.1")
+    args = ap.parse_args()
+
+    def bench(urls, verify=True):
+        no_h2 = False
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+                r = run_backend(name == "h2", urls, args.concurrency, Path(tmp), verify)
+                got = ", ".join(f"{v} x{n}" for v, n in r["versions"].most_common())
+                label = f"{'httpx' if name == 'h2' else 'requests'} [{got}]"
+                print(f"{label:28} {len(urls)} images in {r['wall']:.2f}s  ({r['per_sec']:.1f}/s)  "
+                      f"p50 {r['p50'] * 1000:.0f}ms  p95 {r['p95'] * 1000:.0f}ms  failed {r['failures']}")
+                no_h2 |= name == "h2" and not r["versions"].get("HTTP/2")
+        if no_h2:
+            raise SystemExit("The h2 backend never negotiated HTTP/2 with this server: "
+                             "its numbers above are HTTP/1.1, not a multiplexing result")
+
+    if args.urls:
+        urls = [l.strip() for l in Path(args.urls).read_text(encoding="utf-8").splitlines() if l.strip()]
+        bench(urls)
+    elif args.cdn == "plain":
+        with FakeCDN(args.size, args.latency) as base:
+            print(f"fake CDN at {base} (HTTP/1.1 only), {args.latency * 1000:.0f}ms latency, {args.size} B images")
+            bench([f"{base}/img/{i}.jpg" for i in range(args.count)])
+    else:
+        with tempfile.TemporaryDirectory() as certs:
+            cdn = FakeH2CDN(args.size, args.latency, Path(certs))
+            with cdn as base:
+                print(f"fake CDN at {base} (TLS, h2 + http/1.1), {args.latency * 1000:.0f}ms latency, {args.size} B images")
+                bench([f"{base}/img/{i}.jpg" for i in range(args.count)], verify=str(cdn.cert))
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,18 @@
 
 from __future__ import annotations
-import argparse, csv, os, re, sys, time, random
+import argparse, csv, gzip, hashlib, json, os, re, shutil, subprocess, sys, threading, time, random, zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from glob import escape as glob_escape
 from pathlib import Path
 from typing import Optional, List, Tuple
-from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode, unquote
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode, quote, unquote
 
 import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
+# selenium / webdriver_manager are imported lazily inside the browser helpers so
+# non-browser work doesn't pay their import cost (or need them installed).
 
 UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
 IMG_ACCEPT = "image/avif,image/webp,image/apng,image/*,*/*;q=0.8"
@@ -35,12 +34,13 @@ def read_config(path: str):
             rid = (r.get("id") or r.get("ID") or r.get("Id") or "").strip()
             name = (r.get("Name") or r.get("name") or "").strip()
             link = (r.get("link") or r.get("url") or "").strip()
+            file_name = (r.get("fileName") or r.get("filename") or r.get("file") or "").strip()
             if name and link:
                 try:
                     rid_int: Optional[int] = int(rid)
                 except Exception:
                     rid_int = None
-                rows.append({"id": rid_int, "id_raw": rid, "Name": name, "link": link})
+                rows.append({"id": rid_int, "id_raw": rid, "Name": name, "link": link, "fileName": file_name})
     if not rows:
         raise SystemExit("No rows found with both 'Name' and 'link' in config.")
     return rows
@@ -75,20 +75,301 @@ def _dedupe_preserve_order(items: List[str]) -> List[str]:
             seen.add(x); out.append(x)
     return out
 
-# NEW: check if an image already exists for a given dest_base (any supported extension)
+# ---- card slug parsing: "<name>[-<variant>]-<number>[-<variant>]" ----
+CARD_VARIANTS = (
+    "reverse-holo", "poke-ball", "master-ball", "cosmos-holo", "cracked-ice-holo",
+    "holo", "1st-edition", "shadowless", "prerelease", "staff", "promo",
+)
+_VARIANT_RE = "|".join(re.escape(v) for v in CARD_VARIANTS) + r"|[a-z]+-stamp"
+_SLUG_RE = re.compile(rf"^(?P<name>.+?)(?:-(?P<variant>{_VARIANT_RE}))?-(?P<number>\d+)(?:-(?P<variant2>{_VARIANT_RE}))?$")
+
+def parse_card_slug(lookupid: str) -> dict:
+    """
+    Split a lookupid's card slug into name / set number / variant, e.g.
+    'pokemon-japanese-black-bolt/air-balloon-master-ball-82' -> ('air-balloon', '82', 'master-ball').
+    'ambiguous' is set when the slug doesn't end in a plain number (promo codes
+    like 'gg19' or 'swsh225', sealed products); those need the page to confirm.
+    """
+    slug = lookupid.rstrip("/").rsplit("/", 1)[-1]
+    m = _SLUG_RE.match(slug)
+    if m:
+        return {"name": m.group("name"), "number": m.group("number"),
+                "variant": m.group("variant") or m.group("variant2") or "", "ambiguous": False}
+    m = re.match(r"^(?P<name>.+)-(?P<code>[a-z]{1,5}\d+)$", slug)
+    if m:
+        return {"name": m.group("name"), "number": m.group("code").upper(), "variant": "", "ambiguous": True}
+    return {"name": slug, "number": "", "variant": "", "ambiguous": True}
+
+def number_from_title(title_text: str) -> str:
+    m = re.search(r"#\s*([A-Za-z]*\d+)", title_text or "")
+    return m.group(1) if m else ""
+
+# ---- image integrity ----
+class NotAnImage(ValueError):
+    pass
+
+def sniff_image_ext(head: bytes) -> Optional[str]:
+    """File extension for the image format in the first bytes, None if it isn't one."""
+    if head[:3] == b"\xff\xd8\xff": return ".jpg"
+    if head[:8] == b"\x89PNG\r\n\x1a\n": return ".png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP": return ".webp"
+    if head[:6] in (b"GIF87a", b"GIF89a"): return ".gif"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis", b"mif1"): return ".avif"
+    return None
+
+def image_looks_complete(path: Path) -> bool:
+    """Cheap structural check: known signature at the start, end marker / declared size at the end."""
+    try:
+        size = path.stat().st_size
+        if size < 16: return False
+        with open(path, "rb") as f:
+            head = f.read(16)
+            f.seek(max(0, size - 32))
+            tail = f.read()
+    except Exception:
+        return False
+    if head[:3] == b"\xff\xd8\xff":  # JPEG: EOI near the end
+        return b"\xff\xd9" in tail
+    if head[:8] == b"\x89PNG\r\n\x1a\n":  # PNG: IEND chunk last
+        return b"IEND" in tail
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":  # WEBP: RIFF size covers the file
+        return int.from_bytes(head[4:8], "little") + 8 <= size
+    if head[:6] in (b"GIF87a", b"GIF89a"):  # GIF: trailer byte
+        return tail.rstrip(b"\x00").endswith(b"\x3b")
+    if sniff_image_ext(head) == ".avif":  # AVIF: box header only
+        return True
+    return False
+
+def verify_image(path: Path) -> bool:
+    """image_looks_complete(), plus a decoder pass when Pillow is installed."""
+    if not image_looks_complete(path): return False
+    try:
+        from PIL import Image
+    except ImportError:
+        return True
+    try:
+        with Image.open(path) as im:
+            im.verify()
+        return True
+    except Exception:
+        return False
+
+def drop_broken_images(dest_base: Path, keep: Optional[Path] = None) -> None:
+    for ext in IMG_EXTS:
+        p = dest_base.with_suffix(ext)
+        if p != keep and p.exists() and not image_looks_complete(p):
+            try: p.unlink()
+            except Exception: pass
+
+# check if a complete image already exists for a given dest_base (any supported extension);
+# truncated leftovers don't count
 def find_existing_image(dest_base: Path) -> Optional[Path]:
     for ext in IMG_EXTS:
         p = dest_base.with_suffix(ext)
         try:
-            if p.exists() and p.stat().st_size > 0:
+            if p.exists() and p.stat().st_size > 0 and image_looks_complete(p):
                 return p
         except Exception:
             # If stat fails for any reason, ignore and continue
             pass
     return None
 
+# scraper bookkeeping (driver pin, stats, ...) lives beside the image cache
+def state_path(cache: str, name: str) -> Path:
+    return Path(cache) / ".scraper" / name
+
+def load_json(path: Path, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return default
+
+def save_json(path: Path, data) -> None:
+    ensure_dir(path.parent)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+class JsonStore:
+    """
+    State kept in one JSON file between runs: `data` is loaded on construction
+    (kept in memory only when path is None), changed under `lock` with `dirty`
+    set, and written by save() only when something changed.
+    """
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.data = load_json(path, {}) if path else {}
+        self.lock = threading.Lock()
+        self.dirty = False
+
+    def save(self) -> None:
+        with self.lock:
+            if self.path and self.dirty:
+                save_json(self.path, self.data)
+                self.dirty = False
+
+# --------------- pacing ---------------
+def parse_retry_after(value: Optional[str], cap: float = 300.0) -> Optional[float]:
+    if not value: return None
+    value = value.strip()
+    try:
+        return min(cap, max(0.0, float(value)))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return min(cap, max(0.0, when.timestamp() - time.time()))
+    except Exception:
+        return None
+
+class RateController:
+    """
+    Per-host AIMD pacing shared by page loads and image downloads. Each host
+    gets its own request rate: it creeps up additively while responses are
+    healthy and is cut multiplicatively on 429/503, challenges or slow
+    responses. Retry-After pushes the host's next slot out.
+    """
+    def __init__(self, rate: float = 1.5, min_rate: float = 0.2, max_rate: float = 4.0,
+                 step: float = 0.05, backoff: float = 0.5, slow_secs: float = 10.0):
+        self.start_rate, self.min_rate, self.max_rate = rate, min_rate, max_rate
+        self.step, self.backoff, self.slow_secs = step, backoff, slow_secs
+        self.hosts = {}  # host -> {"rate": float, "next": float}
+        self.lock = threading.Lock()
+
+    def _host(self, url: str) -> dict:
+        host = urlparse(url).netloc.lower()
+        return self.hosts.setdefault(host, {"rate": self.start_rate, "next": 0.0})
+
+    def wait(self, url: str) -> None:
+        """Block until this host's next request slot."""
+        with self.lock:
+            st = self._host(url)
+            now = time.time()
+            slot = max(now, st["next"])
+            st["next"] = slot + random.uniform(0.8, 1.2) / st["rate"]
+        if slot > now:
+            time.sleep(slot - now)
+
+    def ok(self, url: str, elapsed: float) -> None:
+        if elapsed > self.slow_secs:
+            return self.throttled(url, reason=f"slow response {elapsed:.1f}s")
+        with self.lock:
+            st = self._host(url)
+            st["rate"] = min(self.max_rate, st["rate"] + self.step)
+
+    def throttled(self, url: str, retry_after: Optional[float] = None, reason: str = "") -> None:
+        with self.lock:
+            st = self._host(url)
+            st["rate"] = max(self.min_rate, st["rate"] * self.backoff)
+            if retry_after:
+                st["next"] = max(st["next"], time.time() + retry_after)
+            rate = st["rate"]
+        print(f"[rate] {urlparse(url).netloc}: {reason or 'throttled'} -> {rate:.2f} req/s"
+              + (f", retry after {retry_after:.0f}s" if retry_after else ""))
+
+RATE = RateController()
+
+# --------------- chromedriver resolution ---------------
+def _chromedriver_version(path: str) -> str:
+    try:
+        out = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=15).stdout
+    except Exception:
+        return ""
+    m = re.search(r"(\d+(?:\.\d+)+)", out or "")
+    return m.group(1) if m else ""
+
+def _version_matches(version: str, pin: Optional[str]) -> bool:
+    if not version: return False
+    return not pin or version == pin or version.startswith(pin + ".")
+
+def installed_chrome_major() -> Optional[str]:
+    """Major version of the local Chrome (e.g. '128'), or None if it can't be found."""
+    if sys.platform.startswith("win"):
+        cmds = [["reg", "query", r"HKCU\Software\Google\Chrome\BLBeacon", "/v", "version"],
+                ["reg", "query", r"HKLM\Software\Google\Chrome\BLBeacon", "/v", "version"]]
+    elif sys.platform == "darwin":
+        cmds = [["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome", "--version"]]
+    else:
+        cmds = [[c, "--version"] for c in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")]
+    for cmd in cmds:
+        try:
+            out = subprocess.run(cmd, capture_output=True, text=True, timeout=15).stdout
+        except Exception:
+            continue
+        m = re.search(r"(\d+)\.\d+\.\d+", out or "")
+        if m: return m.group(1)
+    return None
+
+def _wdm_cached_drivers() -> List[Path]:
+    """chromedriver binaries webdriver_manager already downloaded (newest first)."""
+    root = Path(os.environ.get("WDM_DRIVERS_DIR") or (Path.home() / ".wdm" / "drivers" / "chromedriver"))
+    if not root.is_dir(): return []
+    found = [p for p in root.rglob("chromedriver*")
+             if p.is_file() and p.name in ("chromedriver", "chromedriver.exe")]
+    def vkey(p: Path):
+        m = re.search(r"/(\d+(?:\.\d+)+)/", p.as_posix())
+        return [int(x) for x in m.group(1).split(".")] if m else []
+    return sorted(found, key=vkey, reverse=True)
+
+def resolve_chromedriver(cache: str, pin: Optional[str] = None, explicit: Optional[str] = None,
+                         refresh: bool = False) -> str:
+    """
+    Locate chromedriver without touching the network when possible:
+      1. explicit --chromedriver / $CHROMEDRIVER path
+      2. the path recorded by a previous run (if it still exists and matches the pin)
+      3. chromedriver on PATH, then webdriver_manager's local download cache
+      4. only then ChromeDriverManager().install() (network), recording the result
+    Without --driver-version, 2 and 3 must match the installed Chrome's major
+    version, so a Chrome auto-update doesn't keep reusing a driver it rejects.
+    """
+    explicit = explicit or os.environ.get("CHROMEDRIVER")
+    if explicit:
+        if not Path(explicit).is_file():
+            raise SystemExit(f"[driver] chromedriver not found at {explicit}")
+        return explicit
+
+    record_path = state_path(cache, "chromedriver.json")
+    want = pin or installed_chrome_major()
+    if not refresh:
+        rec = load_json(record_path, {})
+        p, v = rec.get("path"), rec.get("version", "")
+        if p and Path(p).is_file() and _version_matches(v, want):
+            print(f"[driver] chromedriver {v} (cached) -> {p}")
+            return p
+
+        local = [shutil.which("chromedriver")] + [str(x) for x in _wdm_cached_drivers()]
+        for p in local:
+            if not p: continue
+            v = _chromedriver_version(p)
+            if _version_matches(v, want):
+                save_json(record_path, {"path": p, "version": v, "resolved_at": int(time.time())})
+                print(f"[driver] chromedriver {v} (local) -> {p}")
+                return p
+
+    print(f"[driver] resolving chromedriver {pin or 'for the installed Chrome'} via webdriver_manager (network)…")
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        raise SystemExit("[driver] No matching chromedriver found locally and webdriver_manager isn't installed: "
+                         "pip install webdriver-manager, or pass --chromedriver PATH.")
+    try:
+        p = ChromeDriverManager(driver_version=pin).install() if pin else ChromeDriverManager().install()
+    except Exception as e:
+        raise SystemExit(f"[driver] Could not resolve chromedriver ({e}). "
+                         f"Pass --chromedriver PATH or run once online.")
+    v = _chromedriver_version(p) or (pin or "")
+    save_json(record_path, {"path": p, "version": v, "resolved_at": int(time.time())})
+    return p
+
 # --------------- Selenium ---------------
-def new_driver(headless: bool):
+def new_driver(headless: bool, driver_path: Optional[str] = None, page_load_timeout: float = 60):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    if driver_path is None:
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver_path = ChromeDriverManager().install()
     opts = webdriver.ChromeOptions()
     if headless: opts.add_argument("--headless=new")
     opts.add_argument("--disable-gpu")
@@ -96,13 +377,111 @@ def new_driver(headless: bool):
     opts.add_argument("--log-level=3")
     opts.add_experimental_option("excludeSwitches", ["enable-logging"])
     opts.add_argument("--disable-notifications")
-    service = ChromeService(ChromeDriverManager().install())
+    service = ChromeService(driver_path)
     driver = webdriver.Chrome(service=service, options=opts)
-    driver.set_page_load_timeout(60)
+    driver.set_page_load_timeout(page_load_timeout)
     driver.implicitly_wait(2)
     return driver
 
+# --------------- driver supervision ---------------
+def _proc_tree_rss_linux(root_pid: int) -> Optional[int]:
+    """RSS bytes of root_pid and all descendants, read straight from /proc."""
+    parent, rss = {}, {}
+    page = os.sysconf("SC_PAGE_SIZE")
+    for d in Path("/proc").iterdir():
+        if not d.name.isdigit(): continue
+        try:
+            stat = (d / "stat").read_text()
+        except Exception:
+            continue
+        fields = stat[stat.rfind(")") + 2:].split()
+        parent[int(d.name)] = int(fields[1])
+        rss[int(d.name)] = int(fields[21]) * page
+    if root_pid not in rss: return None
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(c for c, pp in parent.items() if pp == pid)
+    return total
+
+def chrome_rss_mb(driver) -> Optional[float]:
+    """Memory of chromedriver + every Chrome process under it (None if unknown)."""
+    try:
+        pid = driver.service.process.pid
+    except Exception:
+        return None
+    try:
+        import psutil
+        proc = psutil.Process(pid)
+        procs = [proc] + proc.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / 2**20
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    if sys.platform.startswith("linux"):
+        b = _proc_tree_rss_linux(pid)
+        return None if b is None else b / 2**20
+    return None
+
+class DriverSupervisor:
+    """
+    Owns the Chrome instance for a run. checkpoint() is called between cards and
+    swaps in a fresh browser (carrying cookies over) once the page budget or the
+    memory ceiling is exceeded; recycle() is also used after a hung navigation.
+    """
+    def __init__(self, make_driver, *, max_pages: int = 300, max_rss_mb: float = 1500,
+                 home: str = "https://www.pricecharting.com/"):
+        self.make_driver = make_driver
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.home = home
+        self.driver = make_driver()
+        self.pages = 0
+        self.recycles = 0
+        self.reserved = set()  # window handles parked on a human-check; never reused for work
+
+    def checkpoint(self):
+        if self.max_pages and self.pages >= self.max_pages:
+            self.recycle(f"{self.max_pages} pages")
+        elif self.max_rss_mb and self.pages and self.pages % 10 == 0:
+            rss = chrome_rss_mb(self.driver)
+            if rss is not None and rss > self.max_rss_mb:
+                self.recycle(f"Chrome RSS {rss:.0f} MB > {self.max_rss_mb:.0f} MB")
+        self.pages += 1
+        return self.driver
+
+    def recycle(self, reason: str):
+        try:
+            cookies = self.driver.get_cookies()
+        except Exception:
+            cookies = []
+        print(f"[driver] recycling Chrome ({reason}); carrying {len(cookies)} cookies")
+        self.quit()
+        self.driver = self.make_driver()
+        self.pages = 0
+        self.recycles += 1
+        self.reserved = set()
+        if cookies:
+            try:
+                self.driver.get(self.home)
+            except Exception:
+                pass
+            for c in cookies:
+                c = {k: v for k, v in c.items() if k in ("name", "value", "domain", "path", "secure", "httpOnly", "expiry")}
+                try: self.driver.add_cookie(c)
+                except Exception: pass
+        return self.driver
+
+    def quit(self):
+        try: self.driver.quit()
+        except Exception: pass
+        try: self.driver.service.process.kill()
+        except Exception: pass
+
 def page_has_human_check(driver) -> bool:
+    from selenium.webdriver.common.by import By
     try:
         body = driver.find_element(By.TAG_NAME, "body").text.lower()
         return ("answer:" in body) and ("submit" in body)
@@ -110,6 +489,7 @@ def page_has_human_check(driver) -> bool:
         return False
 
 def wait_for_cards_or_human_check(driver, timeout: float):
+    from selenium.webdriver.common.by import By
     end = time.time() + timeout
     while time.time() < end:
         if driver.find_elements(By.CSS_SELECTOR, "a[href^='/game/']"): return "cards"
@@ -124,6 +504,9 @@ def gentle_collect_links(driver, set_slug: str, *, max_rounds: int, stagnant_lim
       - no growth for 'stagnant_limit' rounds, OR
       - completed max_rounds.
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.common.action_chains import ActionChains
     seen = set(); actions = ActionChains(driver); last = -1; stagnant = 0
     for i in range(max_rounds):
         # collect
@@ -159,6 +542,9 @@ def gentle_collect_links(driver, set_slug: str, *, max_rounds: int, stagnant_lim
 
 def collect_links_via_pagination(driver, set_url: str, set_slug: str, max_pages: int = 60, target_count: Optional[int] = None):
     """Fallback: visit ?page=1..N (with stable sort) and harvest all /game/<set_slug>/... links."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
     base = set_url.split("?", 1)[0]
     links = set()
     last = 0
@@ -166,7 +552,7 @@ def collect_links_via_pagination(driver, set_url: str, set_slug: str, max_pages:
     for page in range(1, max_pages + 1):
         url = f"{base}?sort=model-number&page={page}"
         try:
-            driver.get(url)
+            paced_get(driver, url)
             WebDriverWait(driver, 20).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "a[href^='/game/']"))
             )
@@ -189,10 +575,21 @@ def collect_links_via_pagination(driver, set_url: str, set_slug: str, max_pages:
             last = len(links)
         if stagnant >= 2:
             break
-        time.sleep(0.5)
     return sorted(links)
 
 # ---------- image candidate collection ----------
+IMG_SELECTORS = [
+    "img#product-image",
+    "img.product-image",
+    ".image-gallery img",
+    ".gallery img",
+    "img[alt^='Image:']",
+    "img[src*='pricecharting']",
+    "img[src*='cloudfront']",
+]
+IMG_ATTRS = ["src","data-src","data-original","data-lazy","data-image"]
+META_IMAGE_SELECTOR = "meta[property='og:image'],meta[name='og:image'],meta[name='twitter:image']"
+
 def _pick_from_srcset(srcset: str, base: str) -> List[Tuple[str,int]]:
     out = []
     for part in (srcset or "").split(","):
@@ -201,59 +598,140 @@ def _pick_from_srcset(srcset: str, base: str) -> List[Tuple[str,int]]:
         url = _normalize_url(bits[0], base)
         w = 0
         for b in bits[1:]:
-            m = re.match(r"(\\d+)w", b)
+            m = re.match(r"(\d+)w", b)
             if m: w = int(m.group(1)); break
         if url: out.append((url, w))
     return out
 
+def _background_url(style: str) -> str:
+    mm = re.search(r"background-image\s*:\s*url\((['\"]?)(.+?)\1\)", style or "", re.I)
+    return mm.group(2) if mm else ""
+
+def _image_urls_in_html(html: str) -> List[str]:
+    return re.findall(r"https?://[^\"'<>\s]+\.(?:jpg|jpeg|png|webp|gif|avif)\b", html or "", flags=re.I)
+
+def _rank_candidates(scored: List[Tuple[str,int,str]]) -> List[Tuple[str,str]]:
+    scored.sort(key=lambda t: t[1], reverse=True)  # prefer widest srcset
+    seen, out = set(), []
+    for u, _, src in scored:
+        if u and u not in seen:
+            seen.add(u); out.append((u, src))
+    return out
+
 def collect_image_candidates(driver) -> List[str]:
     """Return candidate image URLs, best first."""
+    return [u for u, _ in collect_tagged_candidates(driver)]
+
+def collect_tagged_candidates(driver) -> List[Tuple[str,str]]:
+    """Like collect_image_candidates, but each URL carries the source it came from."""
+    from selenium.webdriver.common.by import By
     base = driver.current_url
-    scored: List[Tuple[str,int]] = []
+    scored: List[Tuple[str,int,str]] = []
 
     # 1) direct <img> (src/data-*) and srcset
-    img_selectors = [
-        "img#product-image",
-        "img.product-image",
-        ".image-gallery img",
-        ".gallery img",
-        "img[alt^='Image:']",
-        "img[src*='pricecharting']",
-        "img[src*='cloudfront']",
-    ]
-    for sel in img_selectors:
+    for sel in IMG_SELECTORS:
         for el in driver.find_elements(By.CSS_SELECTOR, sel):
-            for attr in ["src","data-src","data-original","data-lazy","data-image"]:
+            for attr in IMG_ATTRS:
                 v = el.get_attribute(attr)
                 if v:
                     u = _normalize_url(v, base)
-                    scored.append((u, 0))
-            scored.extend(_pick_from_srcset(el.get_attribute("srcset") or "", base))
+                    scored.append((u, 0, f"img:{sel}"))
+            scored.extend((u, w, f"srcset:{sel}") for u, w in _pick_from_srcset(el.get_attribute("srcset") or "", base))
 
     # 2) <picture><source srcset>
     for pic in driver.find_elements(By.CSS_SELECTOR, "picture source[srcset]"):
-        scored.extend(_pick_from_srcset(pic.get_attribute("srcset") or "", base))
+        scored.extend((u, w, "picture") for u, w in _pick_from_srcset(pic.get_attribute("srcset") or "", base))
 
     # 3) opengraph/twitter
-    for m in driver.find_elements(By.CSS_SELECTOR, "meta[property='og:image'],meta[name='og:image'],meta[name='twitter:image']"):
+    for m in driver.find_elements(By.CSS_SELECTOR, META_IMAGE_SELECTOR):
         v = m.get_attribute("content") or ""
-        if v: scored.append((_normalize_url(v, base), 0))
+        if v: scored.append((_normalize_url(v, base), 0, "og:image"))
 
     # 4) CSS background-image
     for el in driver.find_elements(By.CSS_SELECTOR, "[style*='background-image']"):
-        style = el.get_attribute("style") or ""
-        mm = re.search(r"background-image\\s*:\\s*url\\((['\\\"]?)(.+?)\\1\\)", style, re.I)
-        if mm:
-            scored.append((_normalize_url(mm.group(2), base), 0))
+        u = _background_url(el.get_attribute("style") or "")
+        if u:
+            scored.append((_normalize_url(u, base), 0, "background"))
 
     # 5) last resort: regex in HTML
-    html = driver.page_source or ""
-    mm = re.findall(r"https?://[^\\\"'>]+\\.(?:jpg|jpeg|png|webp|gif|avif)\\b", html, flags=re.I)
-    for u in mm:
-        scored.append((u, 0))
+    for u in _image_urls_in_html(driver.page_source or ""):
+        scored.append((u, 0, "html"))
 
-    scored.sort(key=lambda t: t[1], reverse=True)  # prefer widest srcset
-    return _dedupe_preserve_order([u for (u,_) in scored])
+    return _rank_candidates(scored)
+
+# ---- the same extraction over stored HTML (no browser) ----
+_VOID_TAGS = {"area","base","br","col","embed","hr","img","input","link","meta","source","track","wbr"}
+
+class _PageScan(HTMLParser):
+    """Records the elements collect_tagged_candidates() looks at, with their ancestors' classes."""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[Tuple[str, set]] = []
+        self.imgs, self.sources, self.metas, self.styled, self.titles = [], [], [], [], []
+        self.title, self._in = "", None
+
+    def handle_starttag(self, tag, attrs):
+        a = {k: (v or "") for k, v in attrs}
+        if tag == "img":
+            self.imgs.append((a, [cls for _, cls in self.stack]))
+        elif tag == "source" and a.get("srcset") and any(t == "picture" for t, _ in self.stack):
+            self.sources.append(a)
+        elif tag == "meta":
+            self.metas.append(a)
+        if "background-image" in a.get("style", ""):
+            self.styled.append(a)
+        if self._in is None and (tag in ("h1", "title") or "product-title" in a.get("class", "").split()):
+            self._in = tag
+            self.titles.append(["title" if tag == "title" else "h1", ""])
+        if tag not in _VOID_TAGS:
+            self.stack.append((tag, set(a.get("class", "").split())))
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                break
+        if tag == self._in: self._in = None
+
+    def handle_data(self, data):
+        if self._in and self.titles:
+            self.titles[-1][1] += data
+
+def _img_matches(sel: str, attrs: dict, ancestors: List[set]) -> bool:
+    if sel == "img#product-image": return attrs.get("id") == "product-image"
+    if sel == "img.product-image": return "product-image" in attrs.get("class", "").split()
+    if sel == ".image-gallery img": return any("image-gallery" in c for c in ancestors)
+    if sel == ".gallery img": return any("gallery" in c for c in ancestors)
+    if sel == "img[alt^='Image:']": return attrs.get("alt", "").startswith("Image:")
+    m = re.match(r"img\[src\*='(.+)'\]$", sel)
+    return bool(m) and m.group(1) in attrs.get("src", "")
+
+def scan_page_html(html: str, base: str) -> Tuple[str, List[Tuple[str,str]]]:
+    """(title text, tagged candidates) from stored page HTML, mirroring the live extraction."""
+    scan = _PageScan()
+    scan.feed(html or "")
+    scored: List[Tuple[str,int,str]] = []
+    for sel in IMG_SELECTORS:
+        for attrs, ancestors in scan.imgs:
+            if not _img_matches(sel, attrs, ancestors): continue
+            for attr in IMG_ATTRS:
+                if attrs.get(attr):
+                    scored.append((_normalize_url(attrs[attr], base), 0, f"img:{sel}"))
+            scored.extend((u, w, f"srcset:{sel}") for u, w in _pick_from_srcset(attrs.get("srcset", ""), base))
+    for a in scan.sources:
+        scored.extend((u, w, "picture") for u, w in _pick_from_srcset(a["srcset"], base))
+    for a in scan.metas:
+        if (a.get("property") == "og:image" or a.get("name") in ("og:image", "twitter:image")) and a.get("content"):
+            scored.append((_normalize_url(a["content"], base), 0, "og:image"))
+    for a in scan.styled:
+        u = _background_url(a.get("style", ""))
+        if u: scored.append((_normalize_url(u, base), 0, "background"))
+    for u in _image_urls_in_html(html):
+        scored.append((u, 0, "html"))
+    h1s = [t for kind, t in scan.titles if kind == "h1" and t.strip()]
+    titles = [t for kind, t in scan.titles if kind == "title"]
+    title = (h1s[0] if h1s else (titles[0] if titles else "")).strip()
+    return title, _rank_candidates(scored)
 
 def tweak_query_for_hires(url: str, max_w: int = 1600, max_h: int = 1600) -> str:
     """If URL has width/height hints, try bumping them up."""
@@ -287,31 +765,1351 @@ def sync_cookies_from_driver(driver, session: requests.Session):
             try: session.cookies.set(name, value, domain=domain, path=path)
             except Exception: pass
 
+class Http2Session:
+    """
+    Minimal requests.Session stand-in over httpx with HTTP/2, so concurrent image
+    fetches to one CDN host share a single multiplexed connection. Exposes just
+    what the download path uses: .headers, .cookies.set(...) (same signature, so
+    sync_cookies_from_driver() works unchanged) and .get(..., stream=True).
+    Needs `pip install httpx[http2]`.
+    """
+    def __init__(self, max_connections: int = 8, verify=True):
+        try:
+            import httpx
+            import h2  # noqa: F401  (httpx silently falls back to HTTP/1.1 without it)
+        except ImportError:
+            raise SystemExit("--http2 needs httpx with HTTP/2 support: pip install 'httpx[http2]'")
+        if isinstance(verify, str):  # CA bundle path, as requests takes it
+            import ssl
+            verify = ssl.create_default_context(cafile=verify)
+        self.client = httpx.Client(http2=True, follow_redirects=True, verify=verify,
+                                   limits=httpx.Limits(max_connections=max_connections))
+        self.headers = self.client.headers
+        self.cookies = self.client.cookies
+
+    def get(self, url: str, headers=None, timeout: float = 60, stream: bool = False):
+        req = self.client.build_request("GET", url, headers=headers, timeout=timeout)
+        return _Http2Response(self.client.send(req, stream=True))
+
+    def close(self) -> None:
+        self.client.close()
+
+class _Http2Response:
+    def __init__(self, resp):
+        self.resp = resp
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+        self.http_version = resp.http_version
+
+    def raise_for_status(self) -> None:
+        self.resp.raise_for_status()
+
+    @property
+    def text(self) -> str:
+        self.resp.read()
+        return self.resp.text
+
+    def iter_content(self, chunk_size: int = 65536):
+        try:
+            yield from self.resp.iter_bytes(chunk_size)
+        finally:
+            self.resp.close()
+
+    def close(self) -> None:
+        self.resp.close()
+
+def new_download_session(http2: bool = False, verify=True):
+    """Session for image downloads: requests (HTTP/1.1) by default, httpx HTTP/2 with --http2.
+    `verify` is a CA bundle path or False, as for requests (the benchmark's self-signed CDN)."""
+    if http2:
+        sess = Http2Session(verify=verify)
+    else:
+        sess = requests.Session()
+        sess.verify = verify
+    sess.headers.update({"User-Agent": UA, "Accept-Language": "en-GB,en"})
+    return sess
+
+class ThreadSessions:
+    """
+    A download session per worker thread for pools that fetch without a browser
+    (--retry-failed, --refresh-prices): requests.Session isn't thread-safe. The
+    httpx client behind --http2 is, so that one is shared.
+    """
+    def __init__(self, http2: bool = False):
+        self.http2 = http2
+        self.shared = new_download_session(True) if http2 else None
+        self.local = threading.local()
+        self.sessions = []
+        self.lock = threading.Lock()
+
+    def get(self):
+        if self.shared is not None:
+            return self.shared
+        sess = getattr(self.local, "sess", None)
+        if sess is None:
+            sess = self.local.sess = new_download_session()
+            with self.lock:
+                self.sessions.append(sess)
+        return sess
+
+    def close(self) -> None:
+        for sess in self.sessions + ([self.shared] if self.shared is not None else []):
+            sess.close()
+
+def fetch_to_part(u: str, part: Path, referer: str, session: requests.Session, debug=False) -> bool:
+    """
+    Stream u into `part`, resuming from its current size with a Range request.
+    True once the transfer is complete (checked against Content-Length when the
+    server gives one); False if it broke off and can be resumed. HTTP errors raise.
+    """
+    have = part.stat().st_size if part.exists() else 0
+    headers = {"User-Agent": UA, "Referer": referer, "Accept": IMG_ACCEPT, "Accept-Language": "en-GB,en"}
+    if have: headers["Range"] = f"bytes={have}-"
+    for attempt in range(3):
+        RATE.wait(u)
+        started = time.time()
+        r = session.get(u, headers=headers, timeout=60, stream=True)
+        if debug: print(f"[image] GET {u} -> {r.status_code}" + (f" (resume at {have})" if have else ""))
+        if r.status_code in (429, 503):
+            RATE.throttled(u, parse_retry_after(r.headers.get("Retry-After")), reason=f"HTTP {r.status_code}")
+            r.close()
+            continue
+        RATE.ok(u, time.time() - started)
+        break
+    if r.status_code == 416 and have:  # nothing left to send: the part may already be whole
+        r.close()
+        return True
+    r.raise_for_status()
+    ctype = (r.headers.get("Content-Type") or "").split(";", 1)[0].strip().lower()
+    if ctype and not (ctype.startswith("image/") or ctype in ("application/octet-stream", "binary/octet-stream")):
+        r.close()
+        raise ValueError(f"not an image (Content-Type {ctype})")
+
+    length = r.headers.get("Content-Length")
+    length = int(length) if (length or "").isdigit() and not r.headers.get("Content-Encoding") else None
+    if r.status_code == 206 and have:
+        m = re.match(r"bytes (\d+)-\d+/(\d+|\*)", r.headers.get("Content-Range", ""))
+        if not m or int(m.group(1)) != have:
+            r.close(); part.unlink(missing_ok=True)
+            return False  # server answered a different range: start over
+        total = int(m.group(2)) if m.group(2) != "*" else None
+        mode = "ab"
+    else:
+        have, total, mode = 0, length, "wb"
+
+    written = have
+    try:
+        with open(part, mode) as f:
+            chunks = r.iter_content(65536)
+            if not have:
+                # sniff the first bytes before anything touches the disk
+                head = b""
+                for chunk in chunks:
+                    head += chunk
+                    if len(head) >= 16: break
+                if not sniff_image_ext(head):
+                    r.close()
+                    raise NotAnImage(f"not an image ({ctype or 'no Content-Type'}, starts {head[:12]!r})")
+                f.write(head); written += len(head)
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk); written += len(chunk)
+    except NotAnImage:
+        part.unlink(missing_ok=True)
+        raise
+    except Exception as e:
+        if debug: print(f"[image] interrupted {u} at {written} bytes: {e}")
+        return False
+    if total is not None and written < total:
+        if debug: print(f"[image] short read {u}: {written}/{total} bytes")
+        return False
+    if total is not None and written > total:
+        part.unlink(missing_ok=True)
+        raise ValueError(f"got {written} bytes, Content-Length said {total}")
+    return True
+
 def try_download_first_ok(candidates: List[str], referer: str, dest_base: Path,
-                          session: requests.Session, debug=False) -> Optional[str]:
+                          session: requests.Session, debug=False, report=None) -> Optional[str]:
+    """
+    Download the first candidate that yields a complete image. Responses that
+    aren't images (by Content-Type or magic bytes) are dropped before the body
+    is read. Bytes go to a '.part' file (resumed with Range if a previous
+    transfer broke off), are checked for length and image integrity, then
+    atomically renamed to the extension of the format actually received.
+    """
     ensure_dir(dest_base.parent)
     for u in candidates:
+        # one part file per candidate URL, so a resume never mixes two resources
+        part = dest_base.with_name(f"{dest_base.name}.{hashlib.sha1(u.encode()).hexdigest()[:10]}.part")
         try:
-            headers = {"User-Agent": UA, "Referer": referer, "Accept": IMG_ACCEPT, "Accept-Language": "en-GB,en"}
-            r = session.get(u, headers=headers, timeout=60, stream=True)
-            if debug: print(f"[image] GET {u} -> {r.status_code}")
-            r.raise_for_status()
-            ext = os.path.splitext(urlparse(u).path)[1].lower() or ".jpg"
-            if ext not in IMG_EXTS: ext = ".jpg"
-            dest = dest_base.with_suffix(ext)
-            with open(dest, "wb") as f:
-                for chunk in r.iter_content(65536):
-                    if chunk: f.write(chunk)
+            for _ in range(3):
+                if fetch_to_part(u, part, referer, session, debug): break
+            else:
+                raise IOError("transfer kept breaking off (partial file kept for resume)")
+            if not verify_image(part):
+                part.unlink(missing_ok=True)
+                raise ValueError("downloaded file is not a complete image")
+            with open(part, "rb") as f:
+                dest = dest_base.with_suffix(sniff_image_ext(f.read(16)))  # extension from the bytes, not the URL
+            os.replace(part, dest)
+            drop_broken_images(dest_base, keep=dest)
+            for stale in dest_base.parent.glob(glob_escape(dest_base.name) + ".*.part"):
+                try: stale.unlink()
+                except Exception: pass
+            if report: report(u, True, "")
             return str(dest)
         except Exception as e:
             if debug: print(f"[image] FAIL {u}: {e}")
+            if report: report(u, False, f"{type(e).__name__}: {str(e)[:200]}")
             continue
     return None
 
+# --------------- learned candidate order ---------------
+class CandidateStats(JsonStore):
+    """
+    Remembers, per set, which kind of candidate (source | tweaked-or-original |
+    host) actually downloaded, so later cards try the usual winner first.
+    data: set_slug -> key -> [ok, fail].
+    """
+    @staticmethod
+    def key(tag: str, url: str) -> str:
+        return f"{tag}|{urlparse(url).netloc.lower()}"
+
+    def score(self, set_slug: str, tag: str, url: str) -> float:
+        ok, fail = self.data.get(set_slug, {}).get(self.key(tag, url), (0, 0))
+        return (ok + 1) / (ok + fail + 2)  # Laplace: unseen kinds score 0.5
+
+    def record(self, set_slug: str, tag: str, url: str, ok: bool) -> None:
+        with self.lock:
+            counts = self.data.setdefault(set_slug, {}).setdefault(self.key(tag, url), [0, 0])
+            counts[0 if ok else 1] += 1
+            self.dirty = True
+
+CANDIDATE_STATS = CandidateStats()
+
+def order_candidates(set_slug: str, tagged: List[Tuple[str,str]], hires_tweak: bool) -> List[Tuple[str,str]]:
+    """Expand with --hires-tweak variants and sort by this set's success history
+    (stable, so the page's own preference order breaks ties)."""
+    expanded = []
+    if hires_tweak:
+        for u, src in tagged:
+            t = tweak_query_for_hires(u)
+            expanded.append((t, src + ("|tweak" if t != u else "|orig")))
+    expanded += [(u, src + "|orig") for u, src in tagged]
+    out, seen = [], set()
+    for u, tag in expanded:
+        if u not in seen:
+            seen.add(u); out.append((u, tag))
+    out.sort(key=lambda t: -CANDIDATE_STATS.score(set_slug, t[1], t[0]))
+    return out
+
+
+# --------------- card visit ---------------
+def card_url_for(lookupid: str, set_url: str) -> str:
+    return urljoin(set_url, "/game/" + quote(lookupid, safe="/'"))
+
+def paced_get(driver, url: str) -> None:
+    """driver.get() paced per host by RATE; a load that times out counts as throttling."""
+    from selenium.common.exceptions import TimeoutException
+
+    RATE.wait(url)
+    started = time.time()
+    try:
+        driver.get(url)
+    except TimeoutException:
+        RATE.throttled(url, reason="page load timed out")
+        raise
+    RATE.ok(url, time.time() - started)
+
+def load_card(driver, link: str) -> None:
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    paced_get(driver, link)
+    WebDriverWait(driver, 25).until(
+        EC.any_of(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "img, picture source[srcset], meta[property='og:image'], meta[name='og:image'], meta[name='twitter:image']")),
+            EC.presence_of_element_located((By.CSS_SELECTOR, "h1, .product-title, title"))
+        )
+    )
+
+def page_set_number(driver) -> str:
+    from selenium.webdriver.common.by import By
+    try:
+        title_text = driver.title or ""
+        h1s = driver.find_elements(By.CSS_SELECTOR, "h1, .product-title")
+        if h1s: title_text = h1s[0].text or title_text
+        return number_from_title(title_text)
+    except Exception:
+        return ""
+
+def harvest_card(driver, sess: requests.Session, link: str, dest_base: Path, args,
+                 downloads: Optional["BackgroundDownloads"] = None) -> Optional[str]:
+    """Read the loaded card page in the current window and download its image
+    (on the background worker when one is given).
+    Returns the set number ("" if unknown), or None when --strict-set-number rejects the card."""
+    lookupid = normalize_lookupid(link)
+    # set number: from the page title, else from the slug (skip if missing when strict)
+    set_number = page_set_number(driver) or parse_card_slug(lookupid)["number"]
+
+    # STRICT filter: skip cards without a set number
+    if args.strict_set_number and not set_number:
+        print(f"[skip] {lookupid} has no '#<num>' set number; skipping.")
+        return None
+
+    INDEX.touch_card(lookupid)
+    if args.page_cache:
+        try: store_page(args.cache, lookupid, driver.page_source or "")
+        except Exception as e: print(f"[page-cache] could not store {lookupid}: {e}")
+
+    # a refresh visit (daemon, stale cards) only re-reads the page; a complete image stays
+    if args.only_missing_images:
+        existing = find_existing_image(dest_base)
+        if existing:
+            print(f"[skip] image already cached: {existing}")
+            FAILED.resolve(lookupid)
+            return set_number
+
+    # sync cookies for CDN
+    sync_cookies_from_driver(driver, sess)
+    # gather candidates (prefer biggest; optionally tweak query for hi-res),
+    # then let what worked before for this set go first
+    candidates = order_candidates(lookupid.split("/", 1)[0], collect_tagged_candidates(driver), args.hires_tweak)
+    # download first that works
+    if downloads is not None:
+        downloads.submit(candidates, link, dest_base, sess, args)
+    else:
+        download_card_image(candidates, link, dest_base, sess, args)
+    return set_number
+
+def download_card_image(candidates: List[Tuple[str,str]], link: str, dest_base: Path, sess: requests.Session, args) -> Optional[str]:
+    lookupid = normalize_lookupid(link)
+    set_slug = lookupid.split("/", 1)[0]
+    tags = dict(candidates)
+    errors = {}
+    def report(u: str, ok: bool, reason: str) -> None:
+        CANDIDATE_STATS.record(set_slug, tags.get(u, ""), u, ok)
+        if not ok: errors[u] = reason
+    saved = try_download_first_ok([u for u, _ in candidates], referer=link, dest_base=dest_base, session=sess,
+                                  debug=args.debug_images, report=report)
+    if saved:
+        print(f"[image] saved -> {saved}")
+        FAILED.resolve(lookupid)
+    else:
+        print("[image] FAILED (no candidate worked)")
+        FAILED.add(lookupid, link, candidates, errors or {"": "no image candidates on page"})
+    return saved
+
+class FailedDownloads(JsonStore):
+    """
+    Cards whose image couldn't be downloaded, with the candidate URLs and the
+    error each one gave, so --retry-failed can try again without the browser.
+    data: lookupid -> entry.
+    """
+    def add(self, lookupid: str, link: str, candidates: List[Tuple[str,str]], errors: dict) -> None:
+        with self.lock:
+            prev = self.data.get(lookupid, {})
+            self.data[lookupid] = {"link": link, "candidates": [list(c) for c in candidates], "errors": errors,
+                                   "attempts": prev.get("attempts", 0) + 1, "last_try": int(time.time())}
+            self.dirty = True
+
+    def set_candidates(self, lookupid: str, link: str, candidates: List[Tuple[str,str]]) -> None:
+        """Queue a card for --retry-failed with fresh candidates (attempt count kept)."""
+        with self.lock:
+            entry = self.data.setdefault(lookupid, {"errors": {}, "attempts": 0, "last_try": 0})
+            entry.update(link=link, candidates=[list(c) for c in candidates])
+            self.dirty = True
+
+    def resolve(self, lookupid: str) -> None:
+        with self.lock:
+            if self.data.pop(lookupid, None) is not None:
+                self.dirty = True
+
+FAILED = FailedDownloads()
+
+class RefreshIndex(JsonStore):
+    """
+    When each set listing was last crawled and each card page last visited
+    (epoch seconds), plus card pages whose visit failed. Drives --order stale
+    and --daemon.
+    """
+    def __init__(self, path: Optional[Path] = None):
+        super().__init__(path)
+        self.data.setdefault("sets", {}); self.data.setdefault("cards", {}); self.data.setdefault("failed", {})
+
+    def touch_set(self, set_slug: str) -> None:
+        with self.lock:
+            self.data["sets"][set_slug] = int(time.time())
+            self.dirty = True
+
+    def touch_card(self, lookupid: str) -> None:
+        with self.lock:
+            self.data["cards"][lookupid] = int(time.time())
+            self.data["failed"].pop(lookupid, None)
+            self.dirty = True
+
+    def visit_failed(self, lookupid: str) -> None:
+        """A card page that couldn't be loaded or read; the daemon backs off on it."""
+        with self.lock:
+            prev = self.data["failed"].get(lookupid, {})
+            self.data["failed"][lookupid] = {"attempts": prev.get("attempts", 0) + 1, "last_try": int(time.time())}
+            self.dirty = True
+
+    def set_time(self, set_slug: str) -> Optional[float]:
+        return self.data["sets"].get(set_slug)
+
+    def card_time(self, lookupid: str) -> Optional[float]:
+        return self.data["cards"].get(lookupid)
+
+    def seed_card(self, lookupid: str, t: float) -> float:
+        """Record an assumed last visit for a card never visited; the recorded time wins."""
+        with self.lock:
+            if lookupid not in self.data["cards"]:
+                self.data["cards"][lookupid] = int(t)
+                self.dirty = True
+            return self.data["cards"][lookupid]
+
+INDEX = RefreshIndex()
+
+def visit_card(driver, sess: requests.Session, link: str, dest_base: Path, args,
+               downloads: Optional["BackgroundDownloads"] = None) -> Optional[str]:
+    load_card(driver, link)
+    return harvest_card(driver, sess, link, dest_base, args, downloads)
+
+class BackgroundDownloads:
+    """
+    Runs image downloads on worker thread(s) so the browser can already load
+    the next card (and sit out the polite delay) while the current image is
+    still transferring. At most `depth` downloads are in flight before submit()
+    waits for the oldest. Failures are logged and recorded against their own
+    card inside the worker, never re-raised into a later card's visit.
+    """
+    def __init__(self, depth: int = 2, workers: int = 1):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.pending = deque()
+        self.depth = depth
+        self.local = threading.local()
+        self.sessions = []
+
+    def _session(self, shared, cookies):
+        """This thread's own requests.Session (they aren't thread-safe) with the cookies
+        the browser had when the card was read. The httpx client is thread-safe and shared."""
+        if isinstance(shared, Http2Session):
+            return shared
+        sess = getattr(self.local, "sess", None)
+        if sess is None:
+            sess = self.local.sess = new_download_session()
+            self.sessions.append(sess)
+        sess.cookies.update(cookies)
+        return sess
+
+    def _run(self, candidates: List[Tuple[str,str]], link: str, dest_base: Path, shared, cookies, args) -> Optional[str]:
+        try:
+            return download_card_image(candidates, link, dest_base, self._session(shared, cookies), args)
+        except Exception as e:
+            lookupid = normalize_lookupid(link)
+            print(f"[image] {lookupid} background download failed: {type(e).__name__}: {str(e).strip()[:160]}")
+            FAILED.add(lookupid, link, candidates, {"": f"{type(e).__name__}: {str(e)[:200]}"})
+            return None
+
+    def submit(self, candidates: List[Tuple[str,str]], link: str, dest_base: Path, sess: requests.Session, args) -> None:
+        while len(self.pending) >= self.depth:
+            self.pending.popleft().result()
+        # snapshot the cookies here, on the thread that syncs them from the browser
+        cookies = None if isinstance(sess, Http2Session) else sess.cookies.copy()
+        self.pending.append(self.pool.submit(self._run, candidates, link, dest_base, sess, cookies, args))
+
+    def close(self) -> None:
+        while self.pending:
+            self.pending.popleft().result()
+        self.pool.shutdown(wait=True)
+        for sess in self.sessions:
+            sess.close()
+
+def driver_alive(driver) -> bool:
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+# set on Ctrl+C under --parallel-sets: every worker stops before its next card or set
+STOP = threading.Event()
+
+def supervised_visit(sup: DriverSupervisor, sess: requests.Session, link: str, dest_base: Path, args,
+                     downloads: Optional[BackgroundDownloads] = None) -> Optional[str]:
+    """visit_card() through the supervisor: a hung or dead browser is replaced and
+    the run moves on to the next card instead of dying."""
+    driver = sup.checkpoint()
+    try:
+        return visit_card(driver, sess, link, dest_base, args, downloads)
+    except Exception as e:
+        print(f"[card] {normalize_lookupid(link)} failed: {type(e).__name__}: {str(e).strip()[:160]}")
+        INDEX.visit_failed(normalize_lookupid(link))
+        if STOP.is_set():  # the browser was closed under us on Ctrl+C; don't start another
+            return ""
+        if "receiving message from renderer" in str(e) or not driver_alive(driver):
+            sup.recycle("hung navigation")
+        return ""
+
+class TabPool:
+    """
+    Several tabs of one Chrome. Navigations are fired with location.href so they
+    load side by side; next_done() hands back a tab whose page has finished,
+    oldest submission first. A tab's age only runs while next_done() is
+    polling, so time spent harvesting other tabs (and their synchronous image
+    downloads) counts neither towards its timeout nor as slowness to RATE.
+    """
+    def __init__(self, driver, size: int, reserved=()):
+        self.driver = driver
+        current = driver.current_window_handle
+        self.handles = [current] + [h for h in driver.window_handles
+                                    if h != current and h not in reserved][:size - 1]
+        for _ in range(size - len(self.handles)):
+            driver.switch_to.new_window("tab")
+            self.handles.append(driver.current_window_handle)
+        self.busy = {}  # handle -> (link, self.clock at submit)
+        self.clock = 0.0  # seconds spent inside next_done()
+
+    def idle(self) -> List[str]:
+        return [h for h in self.handles if h not in self.busy]
+
+    def submit(self, link: str) -> None:
+        h = self.idle()[0]
+        self.driver.switch_to.window(h)
+        RATE.wait(link)
+        self.driver.execute_script("window.location.href = arguments[0];", link)
+        self.busy[h] = (link, self.clock)
+
+    def next_done(self, timeout: float) -> Tuple[str, bool]:
+        """Switch to a finished tab and return (link, True); (link, False) if it timed out."""
+        last = time.time()
+        while True:
+            now = time.time()
+            self.clock += now - last
+            last = now
+            for h, (link, started) in sorted(self.busy.items(), key=lambda kv: kv[1][1]):
+                want = unquote(urlparse(link).path).rstrip("/")
+                try:
+                    self.driver.switch_to.window(h)
+                    # the tab's own navigation timing: its real load time, whenever it was polled
+                    state, path, took = self.driver.execute_script(
+                        "const n = performance.getEntriesByType('navigation')[0];"
+                        "return [document.readyState, location.pathname, n ? n.duration / 1000 : 0];")
+                except Exception:
+                    state, path, took = "", "", 0
+                if state == "complete" and unquote(path).rstrip("/") == want:
+                    del self.busy[h]
+                    RATE.ok(link, took or self.clock - started)
+                    return link, True
+                if self.clock - started > timeout:
+                    del self.busy[h]
+                    RATE.throttled(link, reason="page load timed out")
+                    return link, False
+            time.sleep(0.15)
+
+def run_cards_tabs(sup: DriverSupervisor, sess: requests.Session, jobs: List[Tuple[str, str]], args,
+                   downloads: Optional[BackgroundDownloads] = None) -> dict:
+    out, queue = {}, list(jobs)
+    by_link = {link: lookupid for lookupid, link in jobs}
+    pool: Optional[TabPool] = None
+    while (queue or (pool and pool.busy)) and not STOP.is_set():
+        if pool is None or pool.driver is not sup.driver:
+            if pool:  # browser was recycled: whatever was loading in the old tabs goes back in the queue
+                queue[:0] = [(by_link[l], l) for l, _ in pool.busy.values()]
+            pool = TabPool(sup.driver, args.tabs, sup.reserved)
+        while queue and pool.idle():
+            lookupid, link = queue.pop(0)
+            sup.checkpoint()
+            if sup.driver is not pool.driver:
+                queue.insert(0, (lookupid, link))
+                break
+            pool.submit(link)  # paced per host by RATE
+        if pool.driver is not sup.driver or not pool.busy:
+            continue
+        link, ok = pool.next_done(args.nav_timeout)
+        lookupid = by_link[link]
+        if not ok:
+            print(f"[card] {lookupid} timed out after {args.nav_timeout:.0f}s")
+            INDEX.visit_failed(lookupid)
+            out[lookupid] = ""
+            if not STOP.is_set() and not driver_alive(pool.driver):
+                sup.recycle("hung tab")
+            continue
+        try:
+            out[lookupid] = harvest_card(pool.driver, sess, link, Path(args.cache) / lookupid, args, downloads)
+        except Exception as e:
+            print(f"[card] {lookupid} failed: {type(e).__name__}: {str(e).strip()[:160]}")
+            INDEX.visit_failed(lookupid)
+            out[lookupid] = ""
+    return out
+
+def run_cards(sup: DriverSupervisor, sess: requests.Session, jobs: List[Tuple[str, str]], args) -> dict:
+    """Visit (lookupid, link) jobs; returns lookupid -> set number (None = rejected by --strict-set-number)."""
+    downloads = BackgroundDownloads(depth=max(2, 2 * args.download_workers),
+                                    workers=args.download_workers) if args.prefetch else None
+    try:
+        if args.tabs > 1:
+            return run_cards_tabs(sup, sess, jobs, args, downloads)
+        out = {}
+        for lookupid, link in jobs:
+            if STOP.is_set(): break
+            out[lookupid] = supervised_visit(sup, sess, link, Path(args.cache) / lookupid, args, downloads)
+        return out
+    finally:
+        if downloads is not None: downloads.close()
+
+# --------------- set CSVs ---------------
+def set_csv_path(row, out: str) -> Path:
+    """The per-set CSV for a config row: its 'fileName' column, else derived from Name."""
+    name = row.get("fileName") or (re.sub(r"\s+", "_", row["Name"].strip()) + ".csv")
+    return Path(out) / name
+
+def read_set_csv(path: Path) -> List[dict]:
+    rows = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096); f.seek(0)
+        for r in csv.DictReader(f, delimiter=_detect_delim(sample)):
+            lookupid = (r.get("lookupid") or r.get("lookupID") or "").strip()
+            if lookupid:
+                rows.append({"lookupid": lookupid,
+                             "set number": (r.get("set number") or "").strip(),
+                             "Availability": (r.get("Availability") or "").strip()})
+    return rows
+
+def write_set_csv(path: Path, out_rows: List[dict]) -> None:
+    ensure_dir(path.parent)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, lineterminator="\n")  # LF, like the committed CSVs and binders.fill_availability()
+        w.writerow(["id", "lookupid", "set number", "Availability"])
+        for idx, r in enumerate(out_rows, 1):
+            w.writerow([idx, r["lookupid"], r.get("set number",""), r.get("Availability","")])
+    print(f"[write] Wrote {path} ({len(out_rows)} rows)")
+
+# --------------- planning ---------------
+# rough costs used only for the printed estimate
+EST_DISCOVERY_SECS = 150.0   # set page + gentle scroll + pagination fallback
+EST_CARD_SECS = 3.5          # card page load + image download + polite delay
+
+def plan_set(row, args) -> dict:
+    """
+    Work for one config row, computed from the existing set CSV and image cache
+    without a browser. 'discover' means the set listing must be crawled; 'fetch'
+    are lookupids that need a card-page visit.
+    """
+    csv_path = set_csv_path(row, args.out)
+    plan = {"row": row, "csv_path": csv_path, "known": [], "fetch": [], "skip": [], "discover": True}
+    if csv_path.exists():
+        try:
+            plan["known"] = read_set_csv(csv_path)
+        except Exception as e:
+            print(f"[plan] could not read {csv_path}: {e}")
+    if not (args.only_missing_images and plan["known"]) or args.rediscover or args.csv_only:
+        return plan
+    plan["discover"] = False
+    for r in plan["known"]:
+        cached = find_existing_image(Path(args.cache) / r["lookupid"])
+        (plan["skip"] if cached else plan["fetch"]).append(r["lookupid"])
+    return plan
+
+def plan_seconds(plan: dict) -> float:
+    return (EST_DISCOVERY_SECS if plan["discover"] else 0.0) + EST_CARD_SECS * len(plan["fetch"])
+
+def print_plan(plans: List[dict]) -> None:
+    print("[plan] set                                  fetch   skip  est")
+    for p in plans:
+        what = "crawl listing" if p["discover"] else f"{len(p['fetch']):5d}  {len(p['skip']):5d}"
+        print(f"[plan] {p['row']['Name'][:36]:36s} {what:>13s}  ~{plan_seconds(p)/60:.1f} min")
+    total = sum(plan_seconds(p) for p in plans)
+    n_fetch = sum(len(p["fetch"]) for p in plans)
+    n_skip = sum(len(p["skip"]) for p in plans)
+    n_disc = sum(1 for p in plans if p["discover"])
+    print(f"[plan] total: {n_fetch} to fetch, {n_skip} cached, {n_disc} set(s) to crawl, ~{total/60:.1f} min")
+
+def plan_has_work(plan: dict) -> bool:
+    return plan["discover"] or bool(plan["fetch"])
+
+# --------------- per-set runs ---------------
+def sorted_set_url(row) -> str:
+    set_url = row["link"]
+    # force stable sort so pagination is predictable
+    if "sort=" not in set_url:
+        set_url = set_url.split("?", 1)[0] + "?sort=model-number"
+    return set_url
+
+def refresh_known_set(plan: dict, sup: DriverSupervisor, sess: requests.Session, args) -> None:
+    """CSV already lists the set: visit only the cards whose image is missing."""
+    set_url = sorted_set_url(plan["row"])
+    numbers = run_cards(sup, sess, [(l, card_url_for(l, set_url)) for l in plan["fetch"]], args)
+    out_rows = []
+    for r in plan["known"]:
+        num = numbers.get(r["lookupid"], r["set number"])
+        if num is None: continue  # rejected by --strict-set-number
+        out_rows.append({**r, "set number": num or r["set number"] or parse_card_slug(r["lookupid"])["number"]})
+    write_set_csv(plan["csv_path"], out_rows)
+    INDEX.save()
+    CANDIDATE_STATS.save()
+    FAILED.save()
+
+def crawl_and_refresh_set(plan: dict, sup: DriverSupervisor, sess: requests.Session, args) -> None:
+    """Harvest card links from the set page already open in the current tab, then visit them."""
+    driver = sup.driver
+    set_url = sorted_set_url(plan["row"])
+    set_slug = slug_from_set_url(set_url)
+
+    # Long, gentle scroll with tunable limits/target
+    links = gentle_collect_links(
+        driver, set_slug,
+        max_rounds=args.max_rounds,
+        stagnant_limit=args.stagnant_limit,
+        target_count=args.target_count
+    )
+    print(f"[collect] {len(links)} card links")
+
+    # If still short, add pagination fallback
+    if args.target_count is None or len(links) < args.target_count:
+        print("[collect] Adding pagination fallback…")
+        more = collect_links_via_pagination(driver, set_url, set_slug, max_pages=args.max_pages, target_count=args.target_count)
+        before = len(links)
+        links = sorted(set(links) | set(more))
+        print(f"[collect] after pagination: {len(links)} card links (+{len(links)-before})")
+
+    if args.csv_only:
+        write_set_csv(plan["csv_path"], csv_rows_from_links(links, plan, sup, args))
+        INDEX.touch_set(set_slug)
+        INDEX.save()
+        return
+
+    jobs, cached = [], set()
+    for link in links:
+        lookupid = normalize_lookupid(link)
+        # skip if image already cached
+        if args.only_missing_images:
+            existing = find_existing_image(Path(args.cache) / lookupid)
+            if existing:
+                print(f"[skip] already cached: {existing}")
+                cached.add(lookupid)
+                continue
+        jobs.append((lookupid, link))
+    numbers = run_cards(sup, sess, jobs, args)
+
+    prior = {r["lookupid"]: r for r in plan["known"]}
+    out_rows = []
+    for link in links:
+        lookupid = normalize_lookupid(link)
+        old = prior.get(lookupid, {})
+        if lookupid in cached:
+            # Still record row (so CSV is complete), but no download & page visit
+            out_rows.append({"lookupid": lookupid, **old,
+                             "set number": old.get("set number") or parse_card_slug(lookupid)["number"]})
+            continue
+        set_number = numbers.get(lookupid, "")
+        if set_number is None: continue
+        out_rows.append({**old, "lookupid": lookupid, "set number": set_number or old.get("set number", "")})
+
+    write_set_csv(plan["csv_path"], out_rows)
+    INDEX.touch_set(set_slug)
+    INDEX.save()
+    CANDIDATE_STATS.save()
+    FAILED.save()
+
+def csv_rows_from_links(links: List[str], plan: dict, sup: DriverSupervisor, args) -> List[dict]:
+    """--csv-only: set numbers come from the slugs; only ambiguous slugs the
+    previous CSV doesn't already cover cost a page visit."""
+    prior = {r["lookupid"]: r for r in plan["known"]}
+    rows, visits = [], 0
+    for link in links:
+        lookupid = normalize_lookupid(link)
+        old = prior.get(lookupid, {})
+        parsed = parse_card_slug(lookupid)
+        number = "" if parsed["ambiguous"] else parsed["number"]
+        number = number or old.get("set number", "")
+        if not number and parsed["ambiguous"]:
+            visits += 1
+            try:
+                driver = sup.checkpoint()
+                load_card(driver, link)
+                number = page_set_number(driver) or parsed["number"]
+            except Exception as e:
+                print(f"[card] {lookupid}: could not confirm set number ({type(e).__name__})")
+                number = parsed["number"]
+        if args.strict_set_number and not number:
+            print(f"[skip] {lookupid} has no set number; skipping.")
+            continue
+        rows.append({"lookupid": lookupid, **old, "set number": number})
+    print(f"[csv-only] {len(rows)} rows from slugs, {visits} page visit(s) for ambiguous slugs")
+    return rows
+
+# --------------- page cache ---------------
+def page_cache_path(cache: str, lookupid: str) -> Path:
+    return state_path(cache, "pages") / (lookupid + ".html.gz")
+
+def store_page(cache: str, lookupid: str, html: str) -> None:
+    path = page_cache_path(cache, lookupid)
+    ensure_dir(path.parent)
+    tmp = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(html)
+    os.replace(tmp, path)
+
+def load_page(cache: str, lookupid: str, ttl_days: float = 0) -> Optional[str]:
+    path = page_cache_path(cache, lookupid)
+    try:
+        if ttl_days and time.time() - path.stat().st_mtime > ttl_days * 86400:
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read()
+    except Exception:
+        return None
+
+def cached_page_ids(cache: str, set_slug: str, ttl_days: float = 0) -> List[str]:
+    root = state_path(cache, "pages")
+    now, out = time.time(), []
+    for p in sorted((root / set_slug).glob("*.html.gz")):
+        if ttl_days and now - p.stat().st_mtime > ttl_days * 86400: continue
+        out.append(f"{set_slug}/{p.name[:-len('.html.gz')]}")
+    return out
+
+def _reprocess_page(job: Tuple[str, str]) -> Tuple[str, str, List[Tuple[str,str]]]:
+    """Process-pool worker: set number and tagged candidates of one stored page."""
+    cache, lookupid = job
+    html = load_page(cache, lookupid) or ""
+    title, tagged = scan_page_html(html, card_url_for(lookupid, "https://www.pricecharting.com/"))
+    return lookupid, number_from_title(title) or parse_card_slug(lookupid)["number"], tagged
+
+def reprocess_from_page_cache(rows: List[dict], args) -> None:
+    """
+    --from-page-cache: redo set-number parsing and candidate extraction over the
+    stored card pages (no browser, no network). Set CSVs get the new numbers;
+    cards still without an image get their rebuilt candidate lists (ordered as
+    a live run would) in failed.json, so --retry-failed downloads them.
+    """
+    started = time.time()
+    total = queued = 0
+    with ProcessPoolExecutor(max_workers=args.workers or None) as pool:
+        for row in rows:
+            set_slug = slug_from_set_url(row["link"])
+            ids = cached_page_ids(args.cache, set_slug, args.page_cache_ttl)
+            if not ids:
+                print(f"[page-cache] {row['Name']}: no stored pages")
+                continue
+            results = list(pool.map(_reprocess_page, [(args.cache, l) for l in ids], chunksize=16))
+            total += len(results)
+            numbers = {}
+            for lookupid, number, tagged in results:
+                numbers[lookupid] = number
+                if tagged and not find_existing_image(Path(args.cache) / lookupid):
+                    FAILED.set_candidates(lookupid, card_url_for(lookupid, row["link"]),
+                                          order_candidates(set_slug, tagged, args.hires_tweak))
+                    queued += 1
+
+            csv_path = set_csv_path(row, args.out)
+            known = read_set_csv(csv_path) if csv_path.exists() else []
+            seen = {r["lookupid"] for r in known}
+            out_rows = []
+            for r in known + [{"lookupid": l, "set number": ""} for l in ids if l not in seen]:
+                num = numbers.get(r["lookupid"]) or r["set number"]
+                if args.strict_set_number and not num: continue
+                out_rows.append({**r, "set number": num})
+            write_set_csv(csv_path, out_rows)
+            print(f"[page-cache] {row['Name']}: {len(results)} pages reprocessed, "
+                  f"{sum(1 for _, _, t in results if t)} with image candidates")
+    FAILED.save()
+    print(f"[page-cache] {total} pages in {time.time() - started:.1f}s; "
+          f"{queued} missing image(s) queued for --retry-failed")
+
+# --------------- retry failed downloads ---------------
+def retry_failed_downloads(rows: List[dict], args) -> None:
+    """
+    --retry-failed: re-download only the cards recorded in failed.json, straight
+    from their stored candidates (no browser, no page visits). Rounds back off
+    exponentially; whatever still fails stays recorded for next time.
+    """
+    slugs = {slug_from_set_url(r["link"]) for r in rows}
+    todo = []
+    for lookupid, entry in sorted(FAILED.data.items()):
+        if lookupid.split("/", 1)[0] not in slugs: continue
+        if find_existing_image(Path(args.cache) / lookupid):
+            FAILED.resolve(lookupid)
+            continue
+        todo.append((lookupid, entry))
+    print(f"[retry] {len(todo)} failed download(s) to retry")
+
+    sessions = ThreadSessions(args.http2)
+    def attempt(item) -> bool:
+        lookupid, entry = item
+        set_slug = lookupid.split("/", 1)[0]
+        tagged = [tuple(c) for c in entry.get("candidates", [])]
+        tagged.sort(key=lambda t: -CANDIDATE_STATS.score(set_slug, t[1], t[0]))
+        if not tagged: return False
+        print(f"[retry] {lookupid} ({len(tagged)} candidates)")
+        return bool(download_card_image(tagged, entry["link"], Path(args.cache) / lookupid, sessions.get(), args))
+
+    delay = 2.0
+    for rnd in range(1, args.retry_rounds + 1):
+        if not todo: break
+        if rnd > 1:
+            print(f"[retry] round {rnd}: {len(todo)} left, backing off {delay:.0f}s")
+            time.sleep(delay); delay *= 2
+        with ThreadPoolExecutor(max_workers=args.download_workers) as pool:  # pacing per host is still RATE's job
+            ok = list(pool.map(attempt, todo))
+        todo = [item for item, good in zip(todo, ok) if not good]
+    sessions.close()
+    FAILED.save()
+    CANDIDATE_STATS.save()
+    print(f"[retry] done; {len(todo)} still failing" + (f" (see {FAILED.path})" if todo else ""))
+
+# --------------- price refresh ---------------
+PRICE_CELLS = {"Raw Price": "used_price", "PSA 10 Price": "manual_only_price"}  # cards.csv column -> page cell id
+PRICE_CURRENCY = "£"  # what the collection CSV's price columns hold
+
+def parse_prices(html: str) -> Tuple[dict, str]:
+    """({'Raw Price': float, 'PSA 10 Price': float}, currency symbol) from a card
+    page's price table; cells showing no sales ('-') are left out."""
+    out, symbol = {}, ""
+    for col, cell in PRICE_CELLS.items():
+        start = html.find(f'id="{cell}"')
+        td = html[start:html.find("</td>", start)] if start >= 0 else ""
+        m = re.search(r'<span[^>]*class="[^"]*\bprice\b[^"]*"[^>]*>\s*([^<]*)<', td)
+        digits = re.sub(r"[^\d.]", "", m.group(1).replace(",", "")) if m else ""
+        try:
+            out[col] = float(digits)
+        except ValueError:
+            continue
+        symbol = symbol or re.match(r"[^\d.,\s]*", m.group(1).strip()).group(0)
+    return out, symbol
+
+def prices_in_csv_currency(got: dict, symbol: str, args) -> Optional[dict]:
+    """Page prices in PRICE_CURRENCY: as they are, converted at --usd-rate when
+    the page shows dollars, or None when they can't be (other currency, no rate)."""
+    if not got or symbol == PRICE_CURRENCY:
+        return got
+    if symbol == "$" and args.usd_rate:
+        return {col: round(v * args.usd_rate, 2) for col, v in got.items()}
+    return None
+
+def fetch_card_page(sess: requests.Session, lookupid: str, args) -> str:
+    """Card page HTML: from the page cache while younger than --price-max-age, else over HTTP (and stored)."""
+    if args.page_cache and args.price_max_age > 0:  # 0: always fetch (load_page treats 0 as no expiry)
+        html = load_page(args.cache, lookupid, ttl_days=args.price_max_age / 24)
+        if html: return html
+    url = card_url_for(lookupid, "https://www.pricecharting.com/")
+    for _ in range(3):
+        RATE.wait(url)
+        started = time.time()
+        r = sess.get(url, headers={"Accept": "text/html,application/xhtml+xml"}, timeout=60)
+        if r.status_code in (403, 429, 503):
+            RATE.throttled(url, parse_retry_after(r.headers.get("Retry-After")), reason=f"HTTP {r.status_code}")
+            r.close()
+            continue
+        RATE.ok(url, time.time() - started)
+        r.raise_for_status()
+        html = r.text
+        break
+    else:
+        raise IOError(f"still throttled after 3 tries (HTTP {r.status_code})")
+    if args.page_cache:
+        store_page(args.cache, lookupid, html)
+    INDEX.touch_card(lookupid)
+    return html
+
+def format_price(v: float) -> str:
+    """Like the hand-kept CSV: 0.91, 27.5, 12."""
+    return f"{v:.2f}".rstrip("0").rstrip(".")
+
+def same_number(a: Optional[str], b: str) -> bool:
+    try:
+        return abs(float(a) - float(b)) < 0.005
+    except (TypeError, ValueError):
+        return (a or "").strip() == b
+
+def refresh_prices(csv_path: Path, args) -> None:
+    """
+    --refresh-prices: fetch ungraded and PSA 10 prices for every lookupID in a
+    collection CSV (cards.csv), update the file in place with Raw Total =
+    Quantity x Raw Price, and append each change to <name>.price_changes.csv.
+    Pages come through the same session/rate controller/page cache as the scraper.
+    """
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096); f.seek(0)
+        delim = _detect_delim(sample)
+        reader = csv.DictReader(f, delimiter=delim)
+        fields, rows = reader.fieldnames, list(reader)
+    ids = sorted({(r.get("lookupID") or "").strip() for r in rows} - {""})
+    print(f"[prices] {len(rows)} rows, {len(ids)} lookupIDs in {csv_path}")
+
+    sessions = ThreadSessions(args.http2)
+    def one(lookupid: str):
+        try:
+            return (lookupid, *parse_prices(fetch_card_page(sessions.get(), lookupid, args)))
+        except Exception as e:
+            print(f"[prices] {lookupid}: {type(e).__name__}: {str(e)[:160]}")
+            return lookupid, {}, ""
+    prices, refused, started = {}, {}, time.time()
+    with ThreadPoolExecutor(max_workers=args.download_workers) as pool:  # pacing per host is still RATE's job
+        for n, (lookupid, got, symbol) in enumerate(pool.map(one, ids), 1):
+            converted = prices_in_csv_currency(got, symbol, args)
+            if converted is None:
+                refused[lookupid] = symbol
+                converted = {}
+            prices[lookupid] = converted
+            if n % 100 == 0: print(f"[prices] {n}/{len(ids)} ({time.time() - started:.0f}s)")
+    sessions.close()
+    INDEX.save()
+    if refused:
+        print(f"[prices] {len(refused)} card page(s) priced in {'/'.join(sorted(set(refused.values())))} "
+              f"rather than {PRICE_CURRENCY} (e.g. {next(iter(refused))}); left unchanged. "
+              f"Pass --usd-rate to convert dollar prices.")
+
+    changes, stamp = [], time.strftime("%Y-%m-%d %H:%M:%S")
+    for r in rows:
+        got = prices.get((r.get("lookupID") or "").strip(), {})
+        new = {col: format_price(v) for col, v in got.items()}
+        try:
+            qty = float(r.get("Quantity") or 0)
+            raw = float(new.get("Raw Price", r.get("Raw Price")) or 0)
+            new["Raw Total"] = format_price(round(qty * raw, 2))
+        except ValueError:
+            pass
+        for col, val in new.items():
+            if col in r and not same_number(r[col], val):
+                changes.append([stamp, r.get("lookupID", ""), r.get("Name", ""), col, r[col], val])
+                r[col] = val
+
+    missing = sum(1 for i in ids if not prices.get(i) and i not in refused)
+    if changes:
+        tmp = csv_path.with_name(csv_path.name + ".tmp")
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=fields, delimiter=delim, lineterminator="\n")
+            w.writeheader()
+            w.writerows(rows)
+        os.replace(tmp, csv_path)
+        log = csv_path.with_name(csv_path.stem + ".price_changes.csv")
+        new_log = not log.exists()
+        with open(log, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f, delimiter=delim, lineterminator="\n")
+            if new_log: w.writerow(["Date", "lookupID", "Name", "Column", "Old", "New"])
+            w.writerows(changes)
+        print(f"[prices] {len(changes)} value(s) changed; updated {csv_path}, logged to {log}")
+    else:
+        print("[prices] no changes")
+    if missing:
+        print(f"[prices] {missing} lookupID(s) without prices (fetch failed or no sales); left as they were")
+
+# --------------- human checks ---------------
+def applescript_str(s: str) -> str:
+    """s as an AppleScript string literal (quotes and backslashes escaped)."""
+    return '"' + str(s).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def notify(title: str, message: str) -> None:
+    """Best-effort desktop notification (plus the terminal bell)."""
+    print("\a", end="", flush=True)
+    try:
+        if sys.platform == "darwin":
+            subprocess.Popen(["osascript", "-e", f"display notification {applescript_str(message)} with title {applescript_str(title)}"])
+        elif sys.platform.startswith("win"):
+            subprocess.Popen(["msg", "*", "/TIME:3600", f"{title}: {message}"],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elif shutil.which("notify-send"):
+            subprocess.Popen(["notify-send", title, message])
+    except Exception:
+        pass
+
+def park_human_check(sup: DriverSupervisor, plan: dict, args) -> dict:
+    """
+    Leave the challenge open in its own tab, drop a flag file and carry on in a
+    new tab. The set resumes once the card links show up in that tab (solved in
+    Chrome) or the flag file is deleted (the set page is then reloaded).
+    """
+    driver = sup.driver
+    name = plan["row"]["Name"]
+    flag = state_path(args.cache, "human-check-" + slug_from_set_url(plan["row"]["link"]) + ".flag")
+    ensure_dir(flag.parent)
+    flag.write_text(f"{name}\n{sorted_set_url(plan['row'])}\n"
+                    "Solve the check in the Chrome tab, or delete this file to retry.\n", encoding="utf-8")
+    notify("PriceCharting scraper", f"Human-check on {name}")
+    print(f"[attention] Human-check on {name}: parked. Solve it in Chrome (or delete {flag}); other sets continue.")
+    item = {"plan": plan, "flag": flag, "driver": driver, "handle": driver.current_window_handle}
+    sup.reserved.add(item["handle"])
+    driver.switch_to.new_window("tab")
+    return item
+
+def parked_ready(sup: DriverSupervisor, item: dict) -> bool:
+    """Non-blocking check of a parked set; on True the current tab is its set page."""
+    driver = sup.driver
+    set_url = sorted_set_url(item["plan"]["row"])
+    work = driver.current_window_handle
+    try:
+        if item["driver"] is not driver:
+            # browser was recycled underneath us: retry the set in a fresh tab
+            driver.switch_to.new_window("tab")
+            paced_get(driver, set_url)
+            item.update(driver=driver, handle=driver.current_window_handle)
+            sup.reserved.add(item["handle"])
+        else:
+            driver.switch_to.window(item["handle"])
+        status = wait_for_cards_or_human_check(driver, timeout=0.5)
+        if status != "cards" and not item["flag"].exists():
+            paced_get(driver, set_url)
+            status = wait_for_cards_or_human_check(driver, timeout=25)
+            if status == "human":
+                item["flag"].write_text(f"{item['plan']['row']['Name']}\n{set_url}\nStill blocked.\n", encoding="utf-8")
+    except Exception as e:
+        print(f"[attention] could not check parked set {item['plan']['row']['Name']}: {e}")
+        status = "error"
+    if status == "cards":
+        return True
+    try: driver.switch_to.window(work)
+    except Exception: pass
+    return False
+
+def resume_parked(item: dict, sup: DriverSupervisor, sess: requests.Session, args) -> None:
+    row = item["plan"]["row"]
+    print(f"\\n=== {row['Name']} (config id: {row['id_raw']}, resumed after human-check) ===")
+    sup.reserved.discard(item["handle"])
+    try: item["flag"].unlink()
+    except Exception: pass
+    sup.driver.switch_to.window(item["handle"])  # crawl this set's page, whatever tab was checked last
+    crawl_and_refresh_set(item["plan"], sup, sess, args)
+
+# --------------- scheduling ---------------
+def parse_id_spec(spec: str) -> set:
+    """'1,3,5-7' -> {1, 3, 5, 6, 7}"""
+    ids = set()
+    for part in re.split(r"[,\s]+", spec.strip()):
+        if not part: continue
+        m = re.fullmatch(r"(\d+)-(\d+)", part)
+        try:
+            ids.update(range(int(m.group(1)), int(m.group(2)) + 1) if m else [int(part)])
+        except ValueError:
+            raise SystemExit(f"Bad id in --ids: {part!r} (use e.g. '1,3,5-7')")
+    return ids
+
+def select_rows(rows: List[dict], args) -> List[dict]:
+    if args.only_id is None and not args.ids:
+        return rows
+    wanted = parse_id_spec(args.ids or "") | ({args.only_id} if args.only_id is not None else set())
+    return [r for r in rows if r["id"] in wanted]
+
+def set_age(plan: dict) -> float:
+    """Seconds since the set listing was last crawled (per the refresh index, else
+    the set CSV's mtime); infinite if neither exists yet."""
+    crawled = INDEX.set_time(slug_from_set_url(plan["row"]["link"]))
+    if crawled is None:
+        try:
+            crawled = plan["csv_path"].stat().st_mtime
+        except OSError:
+            return float("inf")
+    return time.time() - crawled
+
+def order_plans(plans: List[dict], order: str) -> List[dict]:
+    """
+    'stale' runs the oldest set CSVs first; 'missing' runs the biggest jobs
+    first (crawls, then most cards to fetch) so that with --parallel-sets the
+    long sets start early and the small ones fill in around them.
+    """
+    if order == "stale":
+        return sorted(plans, key=set_age, reverse=True)
+    if order == "missing":
+        return sorted(plans, key=plan_seconds, reverse=True)
+    return list(plans)
+
+def run_set(plan: dict, sup: DriverSupervisor, sess: requests.Session, args, parked: List[dict]) -> None:
+    row = plan["row"]
+    print(f"\\n=== {row['Name']} (config id: {row['id_raw']}) ===")
+    if not plan["discover"]:
+        refresh_known_set(plan, sup, sess, args)
+        return
+    driver = sup.checkpoint()
+    paced_get(driver, sorted_set_url(row))
+    status = wait_for_cards_or_human_check(driver, timeout=25)
+    if status == "human":
+        RATE.throttled(row["link"], reason="human-check")
+        parked.append(park_human_check(sup, plan, args))
+    else:
+        crawl_and_refresh_set(plan, sup, sess, args)
+
+def resume_ready(parked: List[dict], sup: DriverSupervisor, sess: requests.Session, args) -> None:
+    # resume each set right after its own check: the next check switches tabs
+    for item in list(parked):
+        if parked_ready(sup, item):
+            parked.remove(item)
+            resume_parked(item, sup, sess, args)
+
+def supervisor_factory(args):
+    resolved = {"path": resolve_chromedriver(args.cache, pin=args.driver_version,
+                                             explicit=args.chromedriver, refresh=args.refresh_driver)}
+    lock = threading.Lock()
+
+    def make_driver():
+        from selenium.common.exceptions import SessionNotCreatedException
+        path = resolved["path"]
+        try:
+            return new_driver(headless=args.headless, driver_path=path, page_load_timeout=args.nav_timeout)
+        except SessionNotCreatedException as e:
+            if args.chromedriver or os.environ.get("CHROMEDRIVER"):
+                raise
+            # Chrome updated under a recorded driver: resolve again once (records the new path)
+            print(f"[driver] chromedriver rejected by Chrome ({str(e).strip()[:120]}); re-resolving")
+            with lock:
+                if resolved["path"] == path:
+                    resolved["path"] = resolve_chromedriver(args.cache, pin=args.driver_version, refresh=True)
+            return new_driver(headless=args.headless, driver_path=resolved["path"], page_load_timeout=args.nav_timeout)
+
+    return lambda: DriverSupervisor(make_driver, max_pages=args.recycle_pages, max_rss_mb=args.max_chrome_mb)
+
+def set_worker(pending: deque, make_sup, args) -> None:
+    """
+    One browser working through the shared queue of set plans until it is
+    empty, then waiting out its own parked human-checks (their tabs live in
+    this browser). Each set's CSV is written as soon as that set finishes.
+    """
+    sup = make_sup()
+    sess = new_download_session(args.http2)
+    parked: List[dict] = []
+    try:
+        while not STOP.is_set():
+            try:
+                plan = pending.popleft()
+            except IndexError:
+                break
+            run_set(plan, sup, sess, args, parked)
+            resume_ready(parked, sup, sess, args)
+
+        deadline = time.time() + args.human_wait * 60 if args.human_wait else None
+        if parked:
+            print(f"[attention] Waiting on {len(parked)} human-check(s); everything else is done.")
+        while parked and not STOP.is_set():
+            resume_ready(parked, sup, sess, args)
+            if parked and deadline and time.time() > deadline:
+                for item in parked:
+                    print(f"[attention] Gave up on {item['plan']['row']['Name']} (human-check unsolved); flag left at {item['flag']}")
+                break
+            if parked: time.sleep(5)
+    finally:
+        sup.quit()
+        if sup.recycles: print(f"[driver] Chrome was recycled {sup.recycles} time(s)")
+
+# --------------- daemon ---------------
+def retry_at(lookupid: str) -> float:
+    """
+    Earliest time the daemon tries a card again (0 = any time): failed
+    downloads and failed page visits back off 1h, 2h, 4h... (capped at 64h).
+    """
+    at = 0
+    for entry in (FAILED.data.get(lookupid), INDEX.data["failed"].get(lookupid)):
+        if entry:
+            at = max(at, entry.get("last_try", 0) + 3600 * 2 ** min(entry.get("attempts", 1) - 1, 6))
+    return at
+
+def daemon_plan(row, args, now: float) -> Tuple[dict, float]:
+    """
+    What is due for one set right now, and when its next item falls due.
+    The listing is re-crawled once it's older than --set-max-age; otherwise
+    the plan visits cards missing an image, then cards whose page is older
+    than --card-max-age (stalest first). Cards never visited are seeded with
+    their image's mtime, or a spot spread evenly over the last --card-max-age
+    when that's older, so a first run doesn't make the whole collection due
+    at once. A set with missing images is due now. Cards whose
+    download or page visit failed wait out their backoff (retry_at) first.
+    """
+    plan = plan_set(row, args)
+    set_due = now - set_age(plan) + args.set_max_age * 3600
+    if not plan["known"] or set_due <= now:
+        plan.update(discover=True, fetch=[], skip=[])
+        return plan, now
+    plan["discover"] = False
+    backoff = [retry_at(l) for l in plan["fetch"] if retry_at(l) > now]
+    plan["fetch"] = [l for l in plan["fetch"] if retry_at(l) <= now]
+    visited, due_at = {}, {}
+    window = args.card_max_age * 86400
+    for l in plan["skip"]:
+        t = INDEX.card_time(l)
+        if t is None:
+            img = find_existing_image(Path(args.cache) / l)
+            spread = now - window * (zlib.crc32(l.encode()) / 2**32)  # stable per card
+            t = INDEX.seed_card(l, max(img.stat().st_mtime if img else 0, spread))
+        visited[l] = t
+        due_at[l] = max(t + args.card_max_age * 86400, retry_at(l))
+    plan["fetch"] += sorted((l for l in due_at if due_at[l] <= now), key=visited.get)
+    card_due = min([*due_at.values(), *backoff], default=set_due)
+    return plan, min(set_due, card_due, now) if plan["fetch"] else min(set_due, card_due)
+
+def run_daemon(args) -> None:
+    """
+    Keep one warm Chrome and download session and keep working through
+    whatever is stalest: set crawls that are due first, then card visits,
+    at most --daemon-batch cards per cycle and --cards-per-hour on average.
+    The config is re-read every cycle; Ctrl+C stops cleanly.
+    """
+    args.only_missing_images = True
+    sup = supervisor_factory(args)()
+    sess = new_download_session(args.http2)
+    parked: List[dict] = []
+    rows: List[dict] = []
+    print(f"[daemon] sets every {args.set_max_age:g}h, cards every {args.card_max_age:g}d, "
+          f"<= {args.cards_per_hour:g} cards/h")
+
+    def guarded(what: str, fn, *a) -> None:
+        # one bad set or a hung browser costs this step, not the daemon
+        try:
+            fn(*a)
+        except Exception as e:
+            print(f"[daemon] {what} failed: {type(e).__name__}: {str(e).strip()[:160]}")
+            if not driver_alive(sup.driver):
+                sup.recycle("daemon error")
+
+    try:
+        while True:
+            started, now = time.time(), time.time()
+            due, next_due = [], now + args.daemon_poll * 60
+            try:
+                rows = select_rows(read_config(args.config), args)
+            except (Exception, SystemExit) as e:  # config mid-edit: keep the last good one
+                print(f"[daemon] could not read {args.config} ({e}); using the previous config")
+            for row in rows:
+                if any(x["plan"]["row"]["link"] == row["link"] for x in parked):
+                    continue
+                try:
+                    plan, when = daemon_plan(row, args, now)
+                except Exception as e:
+                    print(f"[daemon] could not plan {row.get('Name')}: {type(e).__name__}: {e}")
+                    continue
+                if plan_has_work(plan): due.append((not plan["discover"], when, plan))
+                else: next_due = min(next_due, when)
+            # crawls first, then sets by how long their stalest card has been due
+            due = [plan for *_, plan in sorted(due, key=lambda d: d[:2])]
+            visits = 0  # card pages visited or attempted this cycle, crawls included
+            for plan in due:
+                if visits >= args.daemon_batch: break
+                if not plan["discover"]:
+                    plan["fetch"] = plan["fetch"][:args.daemon_batch - visits]
+                guarded(plan["row"]["Name"], run_set, plan, sup, sess, args, parked)
+                guarded("resuming parked sets", resume_ready, parked, sup, sess, args)
+                visits = sum(1 for t in INDEX.data["cards"].values() if t >= int(started)) + \
+                         sum(1 for f in INDEX.data["failed"].values() if f["last_try"] >= int(started))
+            INDEX.save(); CANDIDATE_STATS.save(); FAILED.save()
+
+            # keep the average under --cards-per-hour; with nothing due, sleep until something is
+            pause = visits * 3600 / args.cards_per_hour - (time.time() - started) if visits else next_due - time.time()
+            pause = min(max(pause, 5 if visits else 60), args.daemon_poll * 60)
+            if not due:
+                print(f"[daemon] nothing due; next check in {pause/60:.0f} min")
+            wake = time.time() + pause
+            while time.time() < wake:
+                time.sleep(min(30, max(0, wake - time.time())))
+                guarded("resuming parked sets", resume_ready, parked, sup, sess, args)
+    except KeyboardInterrupt:
+        print("\n[daemon] stopping")
+    finally:
+        INDEX.save(); CANDIDATE_STATS.save(); FAILED.save()
+        sup.quit()
+
 # --------------- main ---------------
 def main():
     ap = argparse.ArgumentParser(description="Hi-res PriceCharting scraper (big-set friendly, robust, filter by id).")
-    ap.add_argument("--config", required=True)
+    ap.add_argument("--config", help="Set config CSV (id;link;fileName;Name); required except with --refresh-prices")
     ap.add_argument("--cache", default="cache")
     ap.add_argument("--out", default=".")
     ap.add_argument("--headless", action="store_true")
@@ -325,121 +2123,140 @@ def main():
     ap.add_argument("--max-pages", type=int, default=80, help="Pagination fallback upper bound (default 80)")
     # Strict filter:
     ap.add_argument("--strict-set-number", action="store_true",
-                    help="Skip cards that don't expose a '#<num>' set number")
+                    help="Skip cards with no set number: neither a '#<num>' on the page nor a number or "
+                         "promo code (e.g. 'swsh225') at the end of the card's slug")
     # NEW: only add missing images (skip if cache already has an image file for lookupid)
     ap.add_argument("--only-missing-images", action="store_true",
                     help="Skip downloading if an image already exists in cache for the lookupid")
+    # chromedriver resolution (offline-first)
+    ap.add_argument("--chromedriver", default=None, help="Explicit chromedriver path (or set $CHROMEDRIVER)")
+    ap.add_argument("--driver-version", default=None, help="Pin chromedriver version/prefix, e.g. '124' or '124.0.6367.91'")
+    ap.add_argument("--refresh-driver", action="store_true", help="Ignore the recorded chromedriver and re-resolve it")
+    # planning
+    ap.add_argument("--plan-only", action="store_true", help="Print the work plan and exit without starting Chrome")
+    ap.add_argument("--rediscover", action="store_true",
+                    help="With --only-missing-images, crawl the set listing even if the set CSV already exists")
+    # browser lifetime
+    ap.add_argument("--recycle-pages", type=int, default=300, help="Restart Chrome after this many card pages (0 = never)")
+    ap.add_argument("--max-chrome-mb", type=float, default=1500, help="Restart Chrome when its process tree RSS exceeds this (0 = off)")
+    ap.add_argument("--nav-timeout", type=float, default=60, help="Page load timeout in seconds; a hung load restarts Chrome")
+    ap.add_argument("--tabs", type=int, default=1, help="Load this many card pages side by side in tabs of one Chrome (default 1)")
+    ap.add_argument("--prefetch", action="store_true",
+                    help="Download each image in the background while the next card page loads")
+    ap.add_argument("--human-wait", type=float, default=120,
+                    help="Minutes to keep waiting on parked human-checks after all other work is done (0 = forever)")
+    # pacing (per host, adaptive)
+    ap.add_argument("--rate", type=float, default=1.5, help="Starting requests/second per host (default 1.5)")
+    ap.add_argument("--min-rate", type=float, default=0.2, help="Floor the rate backs off to (default 0.2)")
+    ap.add_argument("--max-rate", type=float, default=4.0, help="Ceiling the rate grows to (default 4.0)")
+    ap.add_argument("--slow-secs", type=float, default=10.0, help="Responses slower than this count as throttling (default 10)")
+    ap.add_argument("--csv-only", action="store_true",
+                    help="Write set CSVs from the collected links alone: set numbers come from the slugs, no image downloads")
+    # stored card pages
+    ap.add_argument("--no-page-cache", dest="page_cache", action="store_false",
+                    help="Don't store fetched card pages under <cache>/.scraper/pages")
+    ap.add_argument("--page-cache-ttl", type=float, default=30, help="Days a stored page stays usable (0 = forever, default 30)")
+    ap.add_argument("--from-page-cache", action="store_true",
+                    help="Re-run set-number and image-candidate extraction over stored pages only (no browser/network); "
+                         "missing images are queued for --retry-failed (combine both to download them right away)")
+    ap.add_argument("--workers", type=int, default=0, help="Worker processes for --from-page-cache (default: CPU count)")
+    ap.add_argument("--retry-failed", action="store_true",
+                    help="Only retry downloads recorded as failed, from their stored candidates (no browser)")
+    ap.add_argument("--retry-rounds", type=int, default=3, help="Rounds for --retry-failed, with doubling backoff (default 3)")
+    # multi-set scheduling
+    ap.add_argument("--ids", default=None, help="Config ids to process, e.g. '1,3,5-7' (combines with --only-id)")
+    ap.add_argument("--parallel-sets", type=int, default=1,
+                    help="Sets to run at once, each in its own Chrome; the per-host rate is shared (default 1)")
+    ap.add_argument("--order", choices=("config", "stale", "missing"), default="config",
+                    help="Set order: config file order, oldest set CSV first, or most cards to fetch first")
+    # daemon
+    ap.add_argument("--daemon", action="store_true",
+                    help="Keep running with a warm browser, refreshing whatever is stalest (Ctrl+C to stop)")
+    ap.add_argument("--set-max-age", type=float, default=24, help="Hours before a set listing is re-crawled in --daemon (default 24)")
+    ap.add_argument("--card-max-age", type=float, default=30, help="Days before a card page is revisited in --daemon (default 30)")
+    ap.add_argument("--daemon-batch", type=int, default=50, help="Card visits per --daemon cycle (default 50)")
+    ap.add_argument("--cards-per-hour", type=float, default=300, help="Average card visit budget for --daemon (default 300)")
+    ap.add_argument("--daemon-poll", type=float, default=15, help="Longest --daemon sleep in minutes (default 15)")
+    # prices
+    ap.add_argument("--refresh-prices", metavar="CARDS_CSV", default=None,
+                    help="Refresh Raw/PSA 10 prices and Raw Total in a collection CSV (e.g. cards.csv) in place")
+    ap.add_argument("--price-max-age", type=float, default=12,
+                    help="Hours a stored card page is trusted for prices before it's fetched again; 0 always fetches (default 12)")
+    ap.add_argument("--usd-rate", type=float, default=None, metavar="GBP_PER_USD",
+                    help="Convert card pages priced in $ to £ at this rate (e.g. 0.79); without it they're left unchanged")
+    # download client
+    ap.add_argument("--http2", action="store_true", help="Download images over HTTP/2 with httpx (pip install 'httpx[http2]')")
+    ap.add_argument("--download-workers", type=int, default=1,
+                    help="Concurrent image downloads with --prefetch / --retry-failed, and page fetches with --refresh-prices (default 1)")
     args = ap.parse_args()
+    global RATE, CANDIDATE_STATS, FAILED, INDEX
+    RATE = RateController(rate=args.rate, min_rate=args.min_rate, max_rate=args.max_rate, slow_secs=args.slow_secs)
+    CANDIDATE_STATS = CandidateStats(state_path(args.cache, "candidate_stats.json"))
+    FAILED = FailedDownloads(state_path(args.cache, "failed.json"))
+    INDEX = RefreshIndex(state_path(args.cache, "index.json"))
 
-    rows = read_config(args.config)
-    if args.only_id is not None:
-        rows = [r for r in rows if r["id"] == args.only_id]
-        if not rows:
-            print(f"[info] No config row with id == {args.only_id}. Nothing to do.")
-            return
-
-    driver = new_driver(headless=args.headless)
-    sess = requests.Session()
-    sess.headers.update({"User-Agent": UA, "Accept-Language": "en-GB,en"})
-
-    try:
-        for row in rows:
-            name = row["Name"]; set_url = row["link"]
-            set_slug = slug_from_set_url(set_url)
-
-            # force stable sort so pagination is predictable
-            if "sort=" not in set_url:
-                set_url = set_url.split("?", 1)[0] + "?sort=model-number"
-
-            print(f"\\n=== {name} (config id: {row['id_raw']}) ===")
-            driver.get(set_url)
-            status = wait_for_cards_or_human_check(driver, timeout=25)
-            if status == "human":
-                print("\\n[attention] Human-check detected. Please solve in Chrome and click SUBMIT.")
-                input("Press Enter AFTER it's solved and card links are visible... ")
-
-            # Long, gentle scroll with tunable limits/target
-            links = gentle_collect_links(
-                driver, set_slug,
-                max_rounds=args.max_rounds,
-                stagnant_limit=args.stagnant_limit,
-                target_count=args.target_count
-            )
-            print(f"[collect] {len(links)} card links")
+    if args.refresh_prices:
+        refresh_prices(Path(args.refresh_prices), args)
+        return
+    if not args.config:
+        ap.error("--config is required")
 
-            # If still short, add pagination fallback
-            if args.target_count is None or len(links) < args.target_count:
-                print("[collect] Adding pagination fallback…")
-                more = collect_links_via_pagination(driver, set_url, set_slug, max_pages=args.max_pages, target_count=args.target_count)
-                before = len(links)
-                links = sorted(set(links) | set(more))
-                print(f"[collect] after pagination: {len(links)} card links (+{len(links)-before})")
+    rows = select_rows(read_config(args.config), args)
+    if not rows:
+        print("[info] No config row matches --only-id/--ids. Nothing to do.")
+        return
 
-            out_rows = []
-            for link in links:
-                lookupid = normalize_lookupid(link)
-
-                # NEW: skip if image already cached
-                dest_base = Path(args.cache) / lookupid
-                if args.only_missing_images:
-                    existing = find_existing_image(dest_base)
-                    if existing:
-                        print(f"[skip] already cached: {existing}")
-                        # Still record row (so CSV is complete), but skip download & page visit
-                        out_rows.append({"lookupid": lookupid, "set number": ""})
-                        continue
-
-                driver.get(link)
-                WebDriverWait(driver, 25).until(
-                    EC.any_of(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "img, picture source[srcset], meta[property='og:image'], meta[name='og:image'], meta[name='twitter:image']")),
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "h1, .product-title, title"))
-                    )
-                )
-                # set number (skip if missing when strict)
-                set_number = ""
-                try:
-                    title_text = driver.title or ""
-                    h1s = driver.find_elements(By.CSS_SELECTOR, "h1, .product-title")
-                    if h1s: title_text = h1s[0].text or title_text
-                    m = re.search(r"#\\s*(\\d+)", title_text)
-                    if m: set_number = m.group(1)
-                except Exception:
-                    pass
+    if args.from_page_cache:
+        reprocess_from_page_cache(rows, args)
+        if not args.retry_failed:
+            return
+    if args.retry_failed:
+        retry_failed_downloads(rows, args)
+        return
+    if args.daemon:
+        run_daemon(args)
+        return
 
-                # STRICT filter: skip cards without a set number
-                if args.strict_set_number and not set_number:
-                    print(f"[skip] {lookupid} has no '#<num>' set number; skipping.")
-                    continue
+    # plan before any browser starts; a fully cached refresh never launches Chrome
+    plans = order_plans([plan_set(r, args) for r in rows], args.order)
+    print_plan(plans)
+    if args.plan_only:
+        return
+    plans = [p for p in plans if plan_has_work(p)]
+    if not plans:
+        print("[plan] Nothing to fetch.")
+        return
 
-                # sync cookies for CDN
-                sync_cookies_from_driver(driver, sess)
-                # gather candidates (prefer biggest; optionally tweak query for hi-res)
-                candidates = collect_image_candidates(driver)
-                if args.hires_tweak:
-                    candidates = _dedupe_preserve_order([tweak_query_for_hires(u) for u in candidates] + candidates)
-                # download first that works
-                saved = try_download_first_ok(candidates, referer=link, dest_base=dest_base, session=sess, debug=args.debug_images)
-                if saved:
-                    print(f"[image] saved -> {saved}")
-                else:
-                    print("[image] FAILED (no candidate worked)")
-
-                out_rows.append({"lookupid": lookupid, "set number": set_number})
-                time.sleep(0.4 + random.uniform(0, 0.4))  # polite delay
-
-            # write CSV
-            out_name = re.sub(r"\\s+", "_", name.strip()) + ".csv"
-            out_path = Path(args.out) / out_name
-            with open(out_path, "w", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
-                w.writerow(["id", "lookupid", "set number", "Availability"])
-                for idx, r in enumerate(out_rows, 1):
-                    w.writerow([idx, r["lookupid"], r.get("set number",""), ""])
-            print(f"[write] Wrote {out_path} ({len(out_rows)} rows)")
+    workers = max(1, min(args.parallel_sets, len(plans)))
+    if workers > 1:
+        print(f"[sched] {len(plans)} set(s) across {workers} browsers")
+    pending = deque(plans)
+    make_sup = supervisor_factory(args)
+    try:
+        if workers == 1:
+            set_worker(pending, make_sup, args)
+        else:
+            sups = []
+            def tracked_sup():
+                sup = make_sup()
+                sups.append(sup)
+                return sup
+            pool = ThreadPoolExecutor(max_workers=workers)
+            try:
+                for fut in [pool.submit(set_worker, pending, tracked_sup, args) for _ in range(workers)]:
+                    try: fut.result()
+                    except Exception as e: print(f"[sched] worker stopped: {type(e).__name__}: {e}")
+            except KeyboardInterrupt:
+                # workers only look at STOP between cards; closing their browsers ends the card in flight
+                print("\n[sched] stopping: closing browsers, saving what finished")
+                STOP.set()
+                for sup in sups: sup.quit()
+            finally:
+                pool.shutdown(wait=True)
     finally:
-        try: driver.quit()
-        except Exception: pass
+        CANDIDATE_STATS.save()
+        FAILED.save()
+        INDEX.save()
 
 if __name__ == "__main__":
     main()
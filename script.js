@@ -364,6 +364,43 @@ function showStatus(msg, withRetry=false){
   }
 }
 
+// Folders published by CSV_TO_JSON.py (dist/cache, dist/collections) carry an assets.json:
+// file name -> content-hashed copy and its .gz size. Listed files are fetched as that
+// hashed .gz (cacheable, a fraction of the bytes) and inflated here, since static hosts
+// serve .gz as a plain download; anything else, or a browser without DecompressionStream,
+// gets the plain file.
+const assetManifests = new Map();
+function loadAssetManifest(dirUrl){
+  if (!assetManifests.has(dirUrl)){
+    assetManifests.set(dirUrl, fetch(new URL('assets.json', dirUrl), { cache: 'no-store' })
+      .then(res => res.ok ? res.json() : {})
+      .catch(() => ({})));
+  }
+  return assetManifests.get(dirUrl);
+}
+
+async function fetchPublishedText(url, init = {}){
+  const u = new URL(url, location.href);
+  const name = decodeURIComponent(u.pathname.split('/').pop());
+  const entry = typeof DecompressionStream === 'function' ? (await loadAssetManifest(new URL('.', u).toString()))[name] : null;
+  if (entry && entry.hashed && entry.gz){
+    try{
+      const res = await fetch(new URL(encodeURIComponent(entry.hashed) + '.gz', u), { signal: init.signal });
+      if (res.ok){
+        const buf = new Uint8Array(await res.arrayBuffer());
+        if (buf[0] !== 0x1f || buf[1] !== 0x8b) return new TextDecoder().decode(buf); // server already decoded it
+        return await new Response(new Blob([buf]).stream().pipeThrough(new DecompressionStream('gzip'))).text();
+      }
+    }catch(err){
+      if (init.signal && init.signal.aborted) throw err;
+      console.warn('[assets] compressed copy failed; loading', u.toString(), err);
+    }
+  }
+  const res = await fetch(u, { cache: 'no-store', ...init });
+  if (!res.ok) throw new Error(`HTTP ${res.status} for ${u}`);
+  return await res.text();
+}
+
 async function loadCollectionData(timeoutMs = 20000) {
   let lastErr = null;
   for (let i = 0; i < CARDS_URLS.length; i++){
@@ -373,13 +410,10 @@ async function loadCollectionData(timeoutMs = 20000) {
     console.time(`[collection] fetch ${i===0?'current':'old'} cards.json`);
     console.log('[collection] fetching:', url);
     try{
-      const res = await fetch(url, { cache: 'no-store', signal: ctrl.signal });
-      console.log('[collection] response:', res.status, res.statusText);
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const txt = await fetchPublishedText(url, { signal: ctrl.signal });
       let json;
-      try { json = await res.json(); }
+      try { json = JSON.parse(txt); }
       catch(e){
-        const txt = await res.text();
         console.error('[collection] JSON parse error. First 200 chars:', txt.slice(0,200));
         throw new Error('cards.json not valid JSON');
       }
@@ -502,15 +536,9 @@ function parseCSV(text, delim=','){
   return rows;
 }
 
-async function fetchText(url){
-  const res = await fetch(url, { cache: 'no-store' });
-  if (!res.ok) throw new Error(`HTTP ${res.status} for ${url}`);
-  return await res.text();
-}
-
 async function loadBindersConfig(){
   const url = new URL('collections/config.csv', location.href).toString();
-  const txt = await fetchText(url);
+  const txt = await fetchPublishedText(url);
   // config uses ';' delimiter
   const rows = parseCSV(txt, ';');
   // normalize keys
@@ -524,7 +552,7 @@ async function loadBindersConfig(){
 
 async function loadSetCSV(file){
   const url = new URL('collections/' + file, location.href).toString();
-  const txt = await fetchText(url);
+  const txt = await fetchPublishedText(url);
   const rows = parseCSV(txt, ',');
   // expect headers: id,lookupid,set number,Availability
   return rows.map(r => ({
@@ -535,9 +563,11 @@ async function loadSetCSV(file){
   })).filter(r => r.lookup);
 }
 
-function binderImageSrc(lookup){
-  // images are stored under collections/cache/<lookup>.jpg
-  return new URL('collections/cache/' + String(lookup) + '.jpg', location.href).toString();
+// the scraper names each image after its actual format (collections/cache/<lookup>.jpg, .png, .webp, ...)
+const BINDER_IMAGE_EXTS = ['.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif'];
+
+function binderImageSrc(lookup, ext = BINDER_IMAGE_EXTS[0]){
+  return new URL('collections/cache/' + String(lookup) + ext, location.href).toString();
 }
 
 function canonicalLookup(v){ return String(v || '').trim().toLowerCase(); }
@@ -655,8 +685,10 @@ function renderBinders(sets){
       a.className = 'binder-card'; a.title = card.lookup;
       const img = document.createElement('img');
       img.loading = 'lazy'; img.className = 'binder-img'; img.alt = humanizeCardName(card.lookup);
+      let extIdx = 0;
       img.src = binderImageSrc(card.lookup);
       img.addEventListener('error', () => {
+        if (++extIdx < BINDER_IMAGE_EXTS.length) { img.src = binderImageSrc(card.lookup, BINDER_IMAGE_EXTS[extIdx]); return; }
         const ph = document.createElement('div');
         ph.className = 'binder-img fallback'; ph.textContent = 'No image';
         a.replaceChildren(ph);
@@ -1,27 +1,75 @@
-import { cp, mkdir, rm } from 'node:fs/promises';
+import { copyFile, cp, mkdir, readdir, readFile, rm, stat } from 'node:fs/promises';
 import { fileURLToPath } from 'node:url';
 import path from 'node:path';
 
 const root = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '..');
 const distDir = path.join(root, 'dist');
 
+// The site itself: replaced wholesale on every build.
+const copies = [
+  ['index.html', 'index.html'],
+  ['style.css', 'style.css'],
+  ['script.js', 'script.js'],
+  ['carGame', 'carGame'],
+];
+
+// Data the site fetches, at the same paths under dist/. CSV_TO_JSON.py publishes
+// its outputs (and the set CSVs) here with .gz/.zst sidecars and an assets.json
+// per folder; those files are left alone, everything else is copied from the repo.
+const dataSources = ['cache/cards.json', 'cache/Old_Cards', 'cache/pc_images', 'collections/cache']; // + collections/*.csv
+
+async function exists(p) {
+  try { return await stat(p); } catch { return null; }
+}
+
+async function* walk(p) {
+  const s = await exists(p);
+  if (!s) return;
+  if (!s.isDirectory()) { yield p; return; }
+  for (const name of await readdir(p)) {
+    if (name !== '.DS_Store') yield* walk(path.join(p, name));
+  }
+}
+
+const published = new Map();
+async function publishedNames(dir) {
+  if (!published.has(dir)) {
+    let names = new Set();
+    try { names = new Set(Object.keys(JSON.parse(await readFile(path.join(dir, 'assets.json'), 'utf8')))); } catch {}
+    published.set(dir, names);
+  }
+  return published.get(dir);
+}
+
+async function copyData() {
+  const setCsvs = (await readdir(path.join(root, 'collections'))).filter(n => n.endsWith('.csv')).map(n => 'collections/' + n);
+  let copied = 0, kept = 0;
+  for (const source of [...dataSources, ...setCsvs]) {
+    for await (const from of walk(path.join(root, source))) {
+      const to = path.join(distDir, path.relative(root, from));
+      if ((await publishedNames(path.dirname(to))).has(path.basename(to))) { kept++; continue; }
+      const [src, dest] = await Promise.all([stat(from), exists(to)]);
+      if (dest && dest.mtimeMs >= src.mtimeMs && dest.size === src.size) { kept++; continue; }
+      await mkdir(path.dirname(to), { recursive: true });
+      await copyFile(from, to);
+      copied++;
+    }
+  }
+  return { copied, kept };
+}
+
 async function main() {
-  await rm(distDir, { recursive: true, force: true });
   await mkdir(distDir, { recursive: true });
 
-  const copies = [
-    ['index.html', 'index.html'],
-    ['style.css', 'style.css'],
-    ['script.js', 'script.js'],
-    ['carGame', 'carGame'],
-  ];
-
   for (const [src, dest] of copies) {
     const from = path.join(root, src);
     const to = path.join(distDir, dest);
+    await rm(to, { recursive: true, force: true });
     await cp(from, to, { recursive: true, force: true });
   }
 
+  const { copied, kept } = await copyData();
+  console.log(`data: ${copied} file(s) copied, ${kept} already up to date or published by CSV_TO_JSON.py`);
   console.log('dist/ ready for packaging:', distDir);
 }
 